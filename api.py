@@ -23,13 +23,15 @@ import uvicorn
 from contextlib import asynccontextmanager
 
 from src.graph import CustomerSupportGraph
+from src.llm import LLMFactory
 from src.config import (
     LLM_INPUT_COST_PER_1M,
     LLM_OUTPUT_COST_PER_1M,
     LANGCHAIN_TRACING_V2,
     LANGCHAIN_API_KEY,
     LANGCHAIN_PROJECT,
-    LANGCHAIN_ENDPOINT
+    LANGCHAIN_ENDPOINT,
+    API_WORKERS
 )
 
 try:
@@ -63,9 +65,14 @@ async def lifespan(app: FastAPI):
 
     print("🚀 Initializing chatbot...")
     chatbot = CustomerSupportGraph()
+    try:
+        LLMFactory.warmup()  # Build Groq clients before the first request
+    except Exception as e:
+        print(f"⚠️  LLM warmup skipped: {e}")
     print("✅ Chatbot ready!\n")
     yield
     print("👋 Shutting down...")
+    await LLMFactory.aclose()  # Async Groq pool belongs to this event loop
 
 
 # Initialize FastAPI app
@@ -277,7 +284,7 @@ async def chat(request: ChatRequest):
         start_time = time.time()
         
         # Process message through chatbot
-        result = chatbot.process(request.message)
+        result = await chatbot.aprocess(request.message)
         
         # Calculate latency in milliseconds
         latency_ms = (time.time() - start_time) * 1000
@@ -406,6 +413,7 @@ if __name__ == "__main__":
         "api:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        workers=API_WORKERS,
+        reload=API_WORKERS == 1,  # uvicorn can't reload with multiple workers
         log_level="info"
     )
\ No newline at end of file
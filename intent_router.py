@@ -201,6 +201,10 @@ class IntentRouter:
         # Transform text using TF-IDF
         text_tfidf = self.vectorizer.transform([text])
         
+        return self._predict_from_tfidf(text_tfidf)
+    
+    def _predict_from_tfidf(self, text_tfidf) -> Dict[str, Any]:
+        """Predict intent and confidence for one TF-IDF row (1 x vocabulary)."""
         # Predict intent
         predicted_intent = self.model.predict(text_tfidf)[0]
         
@@ -222,6 +226,10 @@ class IntentRouter:
                 n_classes = len(self.model.classes_)
                 probabilities = [1.0/n_classes] * n_classes
         
+        return self._format_prediction(predicted_intent, probabilities)
+    
+    def _format_prediction(self, predicted_intent: str, probabilities) -> Dict[str, Any]:
+        """Build the prediction dict from one row of class probabilities."""
         confidence = float(max(probabilities))
         
         # Create probability dictionary
@@ -240,10 +248,87 @@ class IntentRouter:
             'top_3_predictions': top_3
         }
     
+    def _predict_batch(self, texts: list) -> list:
+        """
+        Predict intents for many cleaned texts with a single TF-IDF transform
+        and a single classifier call.
+        
+        Args:
+            texts: List of cleaned texts
+            
+        Returns:
+            List of prediction dicts (same format as predict_intent)
+        """
+        text_tfidf = self.vectorizer.transform(texts)
+        
+        try:
+            probabilities = self.model.predict_proba(text_tfidf)
+        except AttributeError:
+            # Same sklearn compatibility fallback as predict_intent
+            return [self.predict_intent(text) for text in texts]
+        
+        predicted_intents = self.model.predict(text_tfidf)
+        
+        return [
+            self._format_prediction(intent, row)
+            for intent, row in zip(predicted_intents, probabilities)
+        ]
+    
+    def embed_batch(self, messages: list):
+        """
+        Clean and TF-IDF-vectorize many messages in one call.
+        
+        The rows can be routed repeatedly (e.g. under several confidence
+        thresholds) with route_from_embedding without re-vectorizing.
+        
+        Args:
+            messages: List of raw user messages
+            
+        Returns:
+            Sparse TF-IDF matrix, one row per message
+        """
+        return self.vectorizer.transform([self.clean_text(msg) for msg in messages])
+    
+    def route_from_embedding(
+        self,
+        embedding,
+        confidence_threshold: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Route a message from its precomputed TF-IDF row.
+        
+        Keyword overrides are not applied, since they need the message text.
+        
+        Args:
+            embedding: One row of embed_batch output
+            confidence_threshold: Override the router's confidence threshold
+            
+        Returns:
+            Dictionary with predicted_intent, confidence, bucket, action,
+            reason, cost_tier and top_3_predictions
+        """
+        prediction = self._predict_from_tfidf(embedding)
+        routing = self.get_routing_decision(
+            prediction['predicted_intent'],
+            prediction['confidence'],
+            confidence_threshold=confidence_threshold
+        )
+        
+        return {
+            'predicted_intent': prediction['predicted_intent'],
+            'confidence': prediction['confidence'],
+            'bucket': routing['bucket'],
+            'action': routing['action'],
+            'reason': routing['reason'],
+            'cost_tier': routing['cost_tier'],
+            'top_3_predictions': prediction['top_3_predictions']
+        }
+    
     def get_routing_decision(
         self, 
         intent: str, 
-        confidence: float
+        confidence: float,
+        confidence_threshold: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Determine routing bucket based on intent and confidence.
@@ -255,10 +340,14 @@ class IntentRouter:
         Args:
             intent: Predicted intent
             confidence: Confidence score
+            confidence_threshold: Override the router's confidence threshold
             
         Returns:
             Dictionary containing routing decision
         """
+        if confidence_threshold is None:
+            confidence_threshold = self.confidence_threshold
+        
         # CRITICAL: Confidence-based fallback
         # If confidence < threshold, route to BUCKET_B (RAG + Small LLM)
         # This avoids:
@@ -267,7 +356,7 @@ class IntentRouter:
         # And provides:
         #   - Safe handling with context (RAG)
         #   - Cost-effective solution (Small LLM)
-        if confidence < self.confidence_threshold:
+        if confidence < confidence_threshold:
             return {
                 'bucket': 'BUCKET_B',
                 'action': 'LOW_CONFIDENCE_RAG',
@@ -331,17 +420,31 @@ class IntentRouter:
         # Step 1.5: Keyword override for obvious FAQs
         override = self._keyword_intent_override(cleaned_text)
         if override is not None:
-            prediction = {
-                'predicted_intent': override['predicted_intent'],
-                'confidence': override['confidence'],
-                'probabilities': {override['predicted_intent']: override['confidence']},
-                'top_3_predictions': [(override['predicted_intent'], override['confidence'])]
-            }
+            prediction = self._override_prediction(override)
         else:
             # Step 2: Predict intent
             prediction = self.predict_intent(cleaned_text)
         
         # Step 3: Get routing decision
+        return self._build_result(user_message, cleaned_text, prediction)
+    
+    @staticmethod
+    def _override_prediction(override: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a keyword override into the prediction dict format."""
+        return {
+            'predicted_intent': override['predicted_intent'],
+            'confidence': override['confidence'],
+            'probabilities': {override['predicted_intent']: override['confidence']},
+            'top_3_predictions': [(override['predicted_intent'], override['confidence'])]
+        }
+    
+    def _build_result(
+        self,
+        user_message: str,
+        cleaned_text: str,
+        prediction: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Combine a prediction with its routing decision."""
         routing = self.get_routing_decision(
             prediction['predicted_intent'],
             prediction['confidence']
@@ -366,13 +469,36 @@ class IntentRouter:
         """
         Route multiple messages in batch.
         
+        Messages without a keyword override are vectorized and classified
+        together in one call instead of one call per message.
+        
         Args:
             messages: List of user messages
             
         Returns:
-            List of routing results
+            List of routing results (same order as messages)
         """
-        return [self.route_message(msg) for msg in messages]
+        cleaned_texts = [self.clean_text(msg) for msg in messages]
+        predictions = [None] * len(messages)
+        
+        # Keyword overrides first; everything else goes to the classifier
+        pending = []
+        for i, cleaned_text in enumerate(cleaned_texts):
+            override = self._keyword_intent_override(cleaned_text)
+            if override is not None:
+                predictions[i] = self._override_prediction(override)
+            else:
+                pending.append(i)
+        
+        if pending:
+            batch_predictions = self._predict_batch([cleaned_texts[i] for i in pending])
+            for i, prediction in zip(pending, batch_predictions):
+                predictions[i] = prediction
+        
+        return [
+            self._build_result(msg, cleaned_text, prediction)
+            for msg, cleaned_text, prediction in zip(messages, cleaned_texts, predictions)
+        ]
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -14,27 +14,70 @@ PROJECT_ROOT = Path(__file__).parent.parent
 MODELS_DIR = PROJECT_ROOT / "models"
 DATA_DIR = PROJECT_ROOT / "data"
 
+# API server
+# Worker processes share the memory-mapped FAISS index pages (see FAISS_MMAP).
+# Each worker runs its own FAISS OpenMP pool, so FAISS_NUM_THREADS defaults to
+# an equal share of the cores per worker instead of all of them.
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
 # FAISS configuration (local vector database)
 FAISS_INDEX_PATH = DATA_DIR / "faiss_index"
 FAISS_METADATA_PATH = DATA_DIR / "faiss_metadata.json"
 
+# FAISS index type (any faiss.index_factory string, e.g. "IVF{nlist},PQ{m}", "IVF{nlist},SQ8", "HNSW32,SQ8", "Flat")
+# IVF + PQ: a query scans only nprobe of nlist inverted lists, and PQ stores
+# m bytes per vector (96 B instead of 1536 B of FP32 for 384 dims).
+# "{nlist}" (~4*sqrt(N)) and "{m}" (dimension // 4) are filled in at build time.
+FAISS_INDEX_FACTORY = os.getenv("FAISS_INDEX_FACTORY", "IVF{nlist},PQ{m}")
+FAISS_NLIST = 1024  # Upper bound on IVF clusters (capped at ~39 training vectors per cluster)
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "0"))  # IVF clusters scanned per query (0 = nlist / 32)
+FAISS_PQ_MIN_TRAIN = 256 * 39  # Smaller corpora fall back to FAISS_SMALL_INDEX_FACTORY (PQ codebooks can't be trained)
+FAISS_SMALL_INDEX_FACTORY = "SQfp16"  # Exhaustive scan over FP16 vectors (half the bytes of Flat)
+FAISS_MMAP = os.getenv("FAISS_MMAP", "true").lower() == "true"  # Memory-map IVF lists instead of loading into RAM
+FAISS_PREFETCH_HOT_LISTS = True  # Page in the most-hit IVF lists at startup
+FAISS_PREFETCH_HOT_LISTS_K = 64  # Number of hot lists to prefetch
+FAISS_PREFETCH_SAMPLE_SIZE = 1024  # Sampled instructions used to find the hot lists
+FAISS_HNSW_EF_CONSTRUCTION = 200  # Build-time graph quality
+FAISS_HNSW_EF_SEARCH = 64  # Query-time recall/speed tradeoff
+FAISS_USE_GPU = os.getenv("FAISS_USE_GPU", "true").lower() == "true"  # Only used with faiss-gpu + CUDA
+FAISS_GPU_FLOAT16 = True  # FP16 storage / PQ lookup tables on GPU
+# OpenMP threads for batched search, per process (cores split across API_WORKERS)
+FAISS_NUM_THREADS = int(os.getenv("FAISS_NUM_THREADS", max(1, (os.cpu_count() or 1) // max(1, API_WORKERS))))
+
 # Groq configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 
 # Embedding configuration (HuggingFace)
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 EMBEDDING_DIMENSION = 384  # all-MiniLM-L6-v2 dimension
+EMBEDDING_BATCH_SIZE_GPU = 256  # Large batches keep the GPU saturated
+EMBEDDING_BATCH_SIZE_CPU = 64
 
 # RAG configuration
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 50
 TOP_K_RETRIEVAL = 2  # Optimized: Reduced from 3 for faster retrieval
+RETRIEVAL_MAX_BATCH_SIZE = 32  # Concurrent async queries coalesced into one FAISS search
+RETRIEVAL_MAX_LATENCY_MS = 10  # Max wait for a micro-batch to fill
+QUERY_CACHE_SIZE = 4096  # LRU entries for query embeddings and retrieval results
+
+# Per-bucket (top_k, nprobe_scale) for retrieval. nprobe_scale is the fraction of
+# the index's automatic nprobe (nlist / 32, nlist sized to the corpus) scanned per
+# query; an explicit FAISS_NPROBE is used as-is for every bucket. Buckets not
+# listed use the index defaults. Only BUCKET_B retrieves (IntentNode relabels
+# BUCKET_A template misses, BUCKET_C never retrieves); its procedural answers
+# only need the top couple of matches.
+RETRIEVAL_PARAMS_BY_BUCKET = {
+    'BUCKET_B': (TOP_K_RETRIEVAL, 0.5),
+}
 
 # LLM configuration (Groq)
 LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")  # Optimized: Faster model (1000+ tok/s)
 LLM_TEMPERATURE = 0.3
 LLM_MAX_TOKENS = 300  # Optimized: Reduced from 500 for faster generation
 BIG_LLM_MODEL = os.getenv("BIG_LLM_MODEL", "llama-3.3-70b-versatile")  # For escalations
+LLM_HTTP_MAX_CONNECTIONS = 100  # Shared Groq connection pool size
+LLM_HTTP_MAX_KEEPALIVE = 32  # Idle connections kept open for reuse
 
 # Cost configuration (USD per 1M tokens)
 LLM_INPUT_COST_PER_1M = float(os.getenv("LLM_INPUT_COST_PER_1M", "0.250"))
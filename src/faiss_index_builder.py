@@ -11,15 +11,30 @@ import numpy as np
 import pandas as pd
 from tqdm import tqdm
 import faiss
+import torch
 from sentence_transformers import SentenceTransformer
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.config import (
     FAISS_INDEX_PATH,
     FAISS_METADATA_PATH,
+    FAISS_INDEX_FACTORY,
+    FAISS_NLIST,
+    FAISS_PQ_MIN_TRAIN,
+    FAISS_SMALL_INDEX_FACTORY,
+    FAISS_HNSW_EF_CONSTRUCTION,
+    FAISS_HNSW_EF_SEARCH,
     EMBEDDING_MODEL,
     EMBEDDING_DIMENSION,
+    EMBEDDING_BATCH_SIZE_GPU,
+    EMBEDDING_BATCH_SIZE_CPU,
     PROJECT_ROOT
 )
+from src.faiss_runtime import configure_threads, index_to_gpu, index_to_cpu
 
 
 class FAISSIndexBuilder:
@@ -27,22 +42,74 @@ class FAISSIndexBuilder:
     
     def __init__(self):
         """Initialize FAISS and HuggingFace model"""
-        print(f"Loading embedding model: {EMBEDDING_MODEL}...")
-        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        print(f"Loading embedding model: {EMBEDDING_MODEL} ({self.device})...")
+        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL, device=self.device)
+        
+        # FP16 weights halve memory traffic on GPU (embeddings are cast back to float32)
+        if self.device == 'cuda':
+            self.embedding_model.half()
+        
         self.dimension = EMBEDDING_DIMENSION
         self.index = None
         self.metadata = []
+        self.gpu_resources = None  # Set while the index lives on GPU
+        configure_threads()
     
-    def create_index(self):
+    def _resolve_index_factory(self, n_vectors=None):
         """
-        Create FAISS index (IndexFlatIP for cosine similarity via normalization)
+        Fill the {nlist} and {m} placeholders of FAISS_INDEX_FACTORY
+        
+        Args:
+            n_vectors: Number of vectors the index will be trained on
+            
+        Returns:
+            faiss.index_factory string
         """
-        print(f"Creating FAISS index with dimension {self.dimension}...")
+        index_factory = FAISS_INDEX_FACTORY
+        
+        # 8-bit PQ trains 256 centroids per sub-quantizer; tiny test builds can't
+        if n_vectors is not None and n_vectors < FAISS_PQ_MIN_TRAIN and 'PQ' in index_factory:
+            print(f"  ⚠ {n_vectors} vectors are too few to train {index_factory}, "
+                  f"using {FAISS_SMALL_INDEX_FACTORY}")
+            return FAISS_SMALL_INDEX_FACTORY
         
-        # Use IndexFlatIP (Inner Product) with normalized vectors for cosine similarity
-        self.index = faiss.IndexFlatIP(self.dimension)
+        if n_vectors is None:
+            nlist = FAISS_NLIST
+        else:
+            # ~4*sqrt(N) lists; k-means needs ~39 training vectors per centroid
+            nlist = max(1, min(FAISS_NLIST, int(4 * np.sqrt(n_vectors)), n_vectors // 39))
+        m = self.dimension // 4  # PQ sub-quantizers (4 dimensions each)
+        return index_factory.replace('{nlist}', str(nlist)).replace('{m}', str(m))
+    
+    def create_index(self, n_vectors=None):
+        """
+        Create FAISS index from FAISS_INDEX_FACTORY (inner product on normalized
+        vectors = cosine similarity). Defaults to IVF + PQ instead of a brute-force scan.
         
+        Args:
+            n_vectors: Expected corpus size (used to size IVF clusters)
+        """
+        index_factory = self._resolve_index_factory(n_vectors)
+        print(f"Creating FAISS index ({index_factory}) with dimension {self.dimension}...")
+
+        # Inner Product metric with normalized vectors for cosine similarity
+        self.index = faiss.index_factory(
+            self.dimension,
+            index_factory,
+            faiss.METRIC_INNER_PRODUCT
+        )
+
+        # HNSW graph parameters (efSearch is persisted with the index)
+        if hasattr(self.index, 'hnsw'):
+            self.index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+            self.index.hnsw.efSearch = FAISS_HNSW_EF_SEARCH
+
         print(f"  ✓ FAISS index created successfully")
+
+        # Move to GPU when faiss-gpu and a CUDA device are available
+        self.index, self.gpu_resources = index_to_gpu(self.index)
+
         return self.index
     
     def load_dataset(self, limit=None):
@@ -92,88 +159,102 @@ class FAISSIndexBuilder:
             df: DataFrame with instruction and response columns
             
         Returns:
-            List of document dicts
+            Tuple of (documents, texts): document dicts with 'id' and
+            'metadata', and the "Question/Answer" texts to embed
         """
         print(f"\nPreparing {len(df)} documents...")
-        
-        documents = []
-        
-        for idx, row in df.iterrows():
-            # Create document text (instruction + response)
-            doc_text = f"Question: {row['instruction']}\nAnswer: {row['response']}"
-            
-            # Metadata
-            metadata = {
-                'instruction': row['instruction'],
-                'response': row['response'],
-                'intent': row['intent'],
-                'category': row['category'],
-                'text': doc_text
-            }
-            
-            # Add optional fields
-            for col in ['tags', 'response_type']:
-                if col in row and pd.notna(row[col]):
-                    metadata[col] = row[col]
-            
-            documents.append({
+
+        # Collapse rows with identical instructions (paraphrase duplicates in the
+        # Bitext dataset); the first row is kept and carries the duplicate count
+        counts = df.groupby('instruction', sort=False)['instruction'].transform('size')
+        df = df.assign(count=counts).drop_duplicates(subset=['instruction'])
+        print(f"  ✓ Deduplicated to {len(df)} unique instructions")
+
+        # Create document text (instruction + response) with vectorized string ops.
+        # Only used for embedding; it is not stored since it duplicates the metadata.
+        texts = (
+            "Question: " + df['instruction'].astype(str)
+            + "\nAnswer: " + df['response'].astype(str)
+        ).tolist()
+        
+        # Metadata (optional fields are kept only where present)
+        optional_cols = [col for col in ['tags', 'response_type'] if col in df.columns]
+        records = df[['instruction', 'response', 'intent', 'category', 'count'] + optional_cols].to_dict(orient='records')
+        if optional_cols:
+            records = [
+                {k: v for k, v in record.items() if k not in optional_cols or pd.notna(v)}
+                for record in records
+            ]
+        
+        documents = [
+            {
                 'id': f"doc_{idx}",
-                'text': doc_text,
-                'metadata': metadata
-            })
+                'metadata': record
+            }
+            for idx, record in zip(df.index, records)
+        ]
         
         print(f"  ✓ Prepared {len(documents)} documents")
-        return documents
+        return documents, texts
     
-    def create_embeddings(self, documents, batch_size=32):
+    def create_embeddings(self, texts, batch_size=None):
         """
         Create embeddings using HuggingFace sentence-transformers
         
         Args:
-            documents: List of document dicts
-            batch_size: Batch size for encoding
+            texts: List of document texts
+            batch_size: Batch size for encoding (default depends on device)
             
         Returns:
-            Documents with embeddings added
+            Unit-normalized float32 numpy matrix, one row per text
         """
-        print(f"\nCreating embeddings for {len(documents)} documents...")
+        print(f"\nCreating embeddings for {len(texts)} documents...")
         print(f"  Model: {EMBEDDING_MODEL}")
         
-        texts = [doc['text'] for doc in documents]
+        if batch_size is None:
+            batch_size = EMBEDDING_BATCH_SIZE_GPU if self.device == 'cuda' else EMBEDDING_BATCH_SIZE_CPU
         
-        # Encode all texts with progress bar
+        # Encode all texts with progress bar (kept as a numpy matrix end-to-end).
+        # L2 normalization happens inside encode, so no separate pass is needed.
         embeddings = self.embedding_model.encode(
             texts,
             batch_size=batch_size,
             show_progress_bar=True,
-            convert_to_numpy=True
-        )
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            output_value='sentence_embedding'
+        ).astype('float32', copy=False)
         
-        # Add embeddings to documents
-        for i, embedding in enumerate(embeddings):
-            documents[i]['embedding'] = embedding.tolist()
-        
-        print(f"  ✓ Created {len(documents)} embeddings")
-        return documents
+        print(f"  ✓ Created {len(embeddings)} embeddings")
+        return embeddings
     
-    def index_documents(self, documents):
+    def index_documents(self, documents, embeddings):
         """
         Index documents into FAISS
         
         Args:
-            documents: List of dicts with 'id', 'embedding', 'metadata'
+            documents: List of dicts with 'id', 'metadata'
+            embeddings: float32 numpy matrix of unit-normalized vectors,
+                one row per document (as returned by create_embeddings)
         """
         if self.index is None:
-            self.create_index()
+            self.create_index(n_vectors=len(embeddings))
         
         print(f"\nIndexing {len(documents)} documents into FAISS...")
-        
-        # Extract embeddings and metadata
-        embeddings = np.array([doc['embedding'] for doc in documents], dtype='float32')
-        
-        # Normalize vectors for cosine similarity with IndexFlatIP
-        faiss.normalize_L2(embeddings)
-        
+
+        # encode(normalize_embeddings=True) already yields unit vectors, so a full
+        # normalize_L2 pass is skipped; spot-check a few rows instead
+        sample_norms = np.linalg.norm(embeddings[:8], axis=1)
+        if not np.allclose(sample_norms, 1.0, atol=1e-4):
+            print(f"  ⚠ Embeddings are not unit-normalized, normalizing before indexing")
+            embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+            faiss.normalize_L2(embeddings)
+
+        # Quantizing indexes (IVF, PQ, SQ) must be trained before adding vectors
+        if not self.index.is_trained:
+            print(f"  → Training index on {len(embeddings)} vectors...")
+            self.index.train(embeddings)
+
         # Add vectors to index
         self.index.add(embeddings)
         
@@ -198,13 +279,18 @@ class FAISSIndexBuilder:
         # Create data directory if needed
         FAISS_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
         
-        # Save index
-        faiss.write_index(self.index, str(FAISS_INDEX_PATH))
+        # Save index (GPU indexes must be copied back to CPU before serialization)
+        index = index_to_cpu(self.index, self.gpu_resources)
+        faiss.write_index(index, str(FAISS_INDEX_PATH))
         print(f"  ✓ Index saved to {FAISS_INDEX_PATH}")
         
-        # Save metadata
-        with open(FAISS_METADATA_PATH, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, indent=2, ensure_ascii=False)
+        # Save metadata (compact JSON; orjson serializes ~10x faster than stdlib json)
+        if orjson is not None:
+            with open(FAISS_METADATA_PATH, 'wb') as f:
+                f.write(orjson.dumps(self.metadata))
+        else:
+            with open(FAISS_METADATA_PATH, 'w', encoding='utf-8') as f:
+                json.dump(self.metadata, f, ensure_ascii=False, separators=(',', ':'))
         print(f"  ✓ Metadata saved to {FAISS_METADATA_PATH}")
     
     def build(self, limit=None):
@@ -218,20 +304,20 @@ class FAISSIndexBuilder:
         print("BUILDING FAISS INDEX")
         print("="*80 + "\n")
         
-        # Step 1: Create index
-        self.create_index()
-        
-        # Step 2: Load dataset
+        # Step 1: Load dataset
         df = self.load_dataset(limit=limit)
         
-        # Step 3: Prepare documents
-        documents = self.prepare_documents(df)
+        # Step 2: Prepare documents
+        documents, texts = self.prepare_documents(df)
+        
+        # Step 3: Create embeddings
+        embeddings = self.create_embeddings(texts)
         
-        # Step 4: Create embeddings
-        documents = self.create_embeddings(documents)
+        # Step 4: Create index (sized for the corpus)
+        self.create_index(n_vectors=len(embeddings))
         
         # Step 5: Index documents
-        self.index_documents(documents)
+        self.index_documents(documents, embeddings)
         
         # Step 6: Save to disk
         self.save_index()
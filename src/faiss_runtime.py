@@ -0,0 +1,95 @@
+"""
+FAISS Runtime Settings
+======================
+
+Process-wide FAISS settings and GPU helpers shared by the index builder
+and the retriever.
+"""
+
+import faiss
+
+from src.config import FAISS_NUM_THREADS, FAISS_USE_GPU, FAISS_GPU_FLOAT16
+
+
+def configure_threads(num_threads=FAISS_NUM_THREADS):
+    """
+    Set the number of OpenMP threads FAISS uses
+    
+    FAISS only parallelizes across the queries of a batch (and across
+    vectors when training/adding), so this matters for batched search.
+    
+    Args:
+        num_threads: Thread count (defaults to FAISS_NUM_THREADS)
+    """
+    faiss.omp_set_num_threads(num_threads)
+
+
+def gpu_available():
+    """True when GPU FAISS is enabled, installed (faiss-gpu) and a CUDA device exists"""
+    return FAISS_USE_GPU and hasattr(faiss, 'StandardGpuResources') and faiss.get_num_gpus() > 0
+
+
+def index_to_gpu(index, device=0):
+    """
+    Copy a CPU index to a GPU, falling back to the CPU index
+    
+    Args:
+        index: CPU FAISS index
+        device: CUDA device number
+        
+    Returns:
+        Tuple of (index, gpu_resources); gpu_resources is None when the index
+        stayed on CPU and must otherwise be kept alive as long as the index
+    """
+    if not gpu_available():
+        return index, None
+    
+    try:
+        gpu_resources = faiss.StandardGpuResources()
+        
+        # FP16 halves the bytes streamed per vector (flat/SQ storage, PQ lookup tables)
+        options = faiss.GpuClonerOptions()
+        options.useFloat16 = FAISS_GPU_FLOAT16
+        gpu_index = faiss.index_cpu_to_gpu(gpu_resources, device, index, options)
+        print(f"  ✓ FAISS index moved to GPU {device}")
+        return gpu_index, gpu_resources
+    except Exception as e:
+        # Not every index type has a GPU implementation (e.g. HNSW)
+        print(f"  ⚠ GPU unavailable for this index type, staying on CPU: {e}")
+        return index, None
+
+
+def index_to_cpu(index, gpu_resources):
+    """
+    Copy an index back to CPU memory (needed before faiss.write_index)
+    
+    Args:
+        index: FAISS index
+        gpu_resources: Resources returned by index_to_gpu (None if on CPU)
+        
+    Returns:
+        CPU FAISS index
+    """
+    return faiss.index_gpu_to_cpu(index) if gpu_resources is not None else index
+
+
+def simd_level():
+    """
+    SIMD level FAISS dispatches its kernels to
+    
+    faiss >= 1.15 compiles all levels into one library and picks one at
+    runtime from the CPU (SIMDConfig). Older builds only report the levels
+    they were compiled with, so the widest one is assumed.
+    
+    Returns:
+        e.g. 'AVX512', 'AVX2', 'NEON' or 'GENERIC'
+    """
+    simd_config = getattr(faiss, 'SIMDConfig', None)
+    if simd_config is not None and hasattr(simd_config, 'get_level_name'):
+        return simd_config.get_level_name()
+    
+    options = faiss.get_compile_options().split() if hasattr(faiss, 'get_compile_options') else []
+    for level in ('AVX512_SPR', 'AVX512', 'AVX2', 'SVE', 'NEON'):
+        if level in options:
+            return level
+    return 'GENERIC'
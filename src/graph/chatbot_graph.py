@@ -5,6 +5,7 @@ Customer Support RAG Graph
 LangGraph state machine for customer support chatbot.
 """
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from src.state import ChatbotState
@@ -34,7 +35,8 @@ class CustomerSupportGraph:
         Conditional edge: Determine if retrieval is needed
         
         Routing logic:
-        - BUCKET_A with missing template → Route to BUCKET_B (retrieve)
+        - BUCKET_A with missing template → Retrieve (IntentNode has already
+          relabeled these BUCKET_B; edge functions can't update the state)
         - BUCKET_B → Always retrieve
         - BUCKET_C → No retrieval (escalation)
         
@@ -44,16 +46,13 @@ class CustomerSupportGraph:
         Returns:
             Next node name ('retrieve' or 'generate')
         """
-        bucket = state['bucket']
+        bucket = state.bucket
         
         # BUCKET_A: Check if template exists
         if bucket == 'BUCKET_A':
-            intent = state['predicted_intent']
+            intent = state.predicted_intent
             if not has_direct_response(intent):
                 # Template missing - fallback to RAG
-                print(f"  ⚠️  Template missing for '{intent}' → Routing to RAG (BUCKET_B)")
-                state['bucket'] = 'BUCKET_B'
-                state['cost_tier'] = 'low'
                 return "retrieve"
             else:
                 # Template exists - no retrieval needed
@@ -67,6 +66,43 @@ class CustomerSupportGraph:
         else:
             return "generate"
     
+    @staticmethod
+    def _may_need_retrieval(routing_result: dict) -> bool:
+        """
+        Whether a routing result can still lead to the retrieve node
+        
+        Mirrors _should_retrieve: BUCKET_A queries with a template and
+        BUCKET_C escalations never retrieve, so prefetching FAISS for them is
+        wasted. (Sentiment escalation can only move a query to BUCKET_C.)
+        
+        Args:
+            routing_result: Result of IntentRouter.route_message
+            
+        Returns:
+            False if retrieval can be skipped
+        """
+        bucket = routing_result['bucket']
+        if bucket == 'BUCKET_C':
+            return False
+        if bucket == 'BUCKET_A':
+            return not has_direct_response(routing_result['predicted_intent'])
+        return True
+    
+    def should_prefetch_retrieval(self, user_query: str) -> bool:
+        """
+        Cheap pre-check (TF-IDF routing only) before speculative retrieval
+        
+        The routing result is kept by the intent node, so the graph run does
+        not classify the query again (release it with intent_node.discard).
+        
+        Args:
+            user_query: User's question
+            
+        Returns:
+            True if the query may be routed to retrieval
+        """
+        return self._may_need_retrieval(self.intent_node.route(user_query))
+    
     def _build_graph(self) -> StateGraph:
         """
         Build the LangGraph state machine
@@ -81,8 +117,16 @@ class CustomerSupportGraph:
         
         # Add nodes
         workflow.add_node("intent", self.intent_node) # Intent classification node (BUCKET_A, BUCKET_B, BUCKET_C)
-        workflow.add_node("retrieve", self.retrieve_node) # Retrieval node (only invoked for BUCKET_B)
-        workflow.add_node("generate", self.generate_node) # Generation node (invoked for all buckets, but with different context)
+        workflow.add_node(
+            "retrieve",
+            # Async path (ainvoke) micro-batches concurrent FAISS searches
+            RunnableLambda(self.retrieve_node, afunc=self.retrieve_node.acall)
+        ) # Retrieval node (only invoked for BUCKET_B)
+        workflow.add_node(
+            "generate",
+            # Async path (ainvoke) awaits the LLM on the shared async connection pool
+            RunnableLambda(self.generate_node, afunc=self.generate_node.acall)
+        ) # Generation node (invoked for all buckets, but with different context)
         
         # Set entry point
         workflow.set_entry_point("intent") # Start with intent classification
@@ -118,28 +162,76 @@ class CustomerSupportGraph:
         print(f"Processing: {user_query}")
         print('='*80)
         
-        # Initialize state
-        initial_state = {
-            'user_query': user_query,
-            'predicted_intent': '',
-            'confidence': 0.0,
-            'bucket': '',
-            'retrieved_documents': [],
-            'retrieved_context': '',
-            'final_response': '',
-            'llm_usage': {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
-            'messages': [],
-            'cost_tier': '',
-            'action': ''
-        }
+        # Run graph
+        final_state = self.graph.invoke(self._initial_state(user_query))
+        
+        print('='*80 + '\n')
+        
+        return final_state
+    
+    async def aprocess(self, user_query: str) -> dict:
+        """
+        Async version of process (does not block the event loop)
+        
+        Args:
+            user_query: User's question
+            
+        Returns:
+            Final state with response
+        """
+        print(f"\n{'='*80}")
+        print(f"Processing: {user_query}")
+        print('='*80)
         
         # Run graph
-        final_state = self.graph.invoke(initial_state)
+        final_state = await self.graph.ainvoke(self._initial_state(user_query))
         
         print('='*80 + '\n')
         
         return final_state
     
+    def process_batch(self, user_queries: list) -> list:
+        """
+        Process several user queries through the graph together
+        
+        Intent classification, sentiment analysis and FAISS retrieval run
+        once for the whole batch; generation runs concurrently per query.
+        
+        Args:
+            user_queries: List of user questions
+            
+        Returns:
+            List of final states (same order as user_queries)
+        """
+        print(f"\n{'='*80}")
+        print(f"Processing batch of {len(user_queries)} queries")
+        print('='*80)
+        
+        self.intent_node.prefetch(user_queries)
+        
+        # Only batch-search queries that can still reach the retrieve node
+        rag_queries = [
+            query for query in dict.fromkeys(user_queries)
+            if self._may_need_retrieval(self.intent_node.peek_routing(query))
+        ]
+        self.retrieve_node.prefetch(rag_queries)
+        try:
+            final_states = self.graph.batch(
+                [self._initial_state(query) for query in user_queries]
+            )
+        finally:
+            self.intent_node.discard(user_queries)
+            self.retrieve_node.discard(user_queries)
+        
+        print('='*80 + '\n')
+        
+        return final_states
+    
+    @staticmethod
+    def _initial_state(user_query: str) -> dict:
+        """Build the initial graph state for a query (all fields at their defaults)"""
+        return ChatbotState(user_query=user_query).to_dict()
+    
     def get_response(self, user_query: str) -> str:
         """
         Convenience method to get just the response
@@ -5,14 +5,29 @@ LLM Configuration and Setup
 Language model configurations for different buckets.
 """
 
+import atexit
+import threading
+
+import httpx
 from langchain_groq import ChatGroq
 from src.config import (
     GROQ_API_KEY,
     LLM_MODEL,
     LLM_TEMPERATURE,
     LLM_MAX_TOKENS,
-    BIG_LLM_MODEL
+    BIG_LLM_MODEL,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE
+)
+
+# Shared HTTP connection pools for all Groq clients (keep-alive TCP/TLS reuse):
+# the sync pool serves invoke, the async pool ainvoke (GenerateNode.acall)
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=LLM_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE
 )
+_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS, http2=True)
+_ASYNC_HTTP_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS, http2=True)
 
 
 def get_small_llm():
@@ -26,7 +41,9 @@ def get_small_llm():
         model=LLM_MODEL,
         temperature=LLM_TEMPERATURE,
         max_tokens=LLM_MAX_TOKENS,
-        groq_api_key=GROQ_API_KEY
+        groq_api_key=GROQ_API_KEY,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_ASYNC_HTTP_CLIENT
     )
 
 
@@ -41,7 +58,9 @@ def get_big_llm():
         model=BIG_LLM_MODEL,
         temperature=0.3,
         max_tokens=1000,
-        groq_api_key=GROQ_API_KEY
+        groq_api_key=GROQ_API_KEY,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_ASYNC_HTTP_CLIENT
     )
 
 
@@ -50,6 +69,7 @@ class LLMFactory:
     
     _small_llm = None
     _big_llm = None
+    _lock = threading.Lock()  # Guards lazy creation under concurrent requests
     
     @classmethod
     def get_llm_for_bucket(cls, bucket: str):
@@ -67,19 +87,48 @@ class LLMFactory:
         
         elif bucket == 'BUCKET_B':
             if cls._small_llm is None:
-                cls._small_llm = get_small_llm()
+                with cls._lock:
+                    if cls._small_llm is None:
+                        cls._small_llm = get_small_llm()
             return cls._small_llm
         
         elif bucket == 'BUCKET_C':
             if cls._big_llm is None:
-                cls._big_llm = get_big_llm()
+                with cls._lock:
+                    if cls._big_llm is None:
+                        cls._big_llm = get_big_llm()
             return cls._big_llm
         
         else:
             raise ValueError(f"Unknown bucket: {bucket}")
     
+    @classmethod
+    def warmup(cls):
+        """Create both LLM clients ahead of the first request (no API call)"""
+        cls.get_llm_for_bucket('BUCKET_B')
+        cls.get_llm_for_bucket('BUCKET_C')
+    
+    @staticmethod
+    def close():
+        """Close the shared sync HTTP connection pool (registered with atexit)"""
+        _HTTP_CLIENT.close()
+    
+    @staticmethod
+    async def aclose():
+        """
+        Close the shared async HTTP connection pool
+        
+        Must be awaited on the event loop that used it (e.g. on API shutdown);
+        its connections can't be closed from another loop.
+        """
+        await _ASYNC_HTTP_CLIENT.aclose()
+    
     @classmethod
     def reset(cls):
         """Reset cached LLM instances"""
-        cls._small_llm = None
-        cls._big_llm = None
+        with cls._lock:
+            cls._small_llm = None
+            cls._big_llm = None
+
+
+atexit.register(LLMFactory.close)
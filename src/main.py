@@ -6,6 +6,7 @@ Complete chatbot with graph-based routing and response generation.
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add project root to path
@@ -14,6 +15,9 @@ sys.path.insert(0, str(project_root))
 
 from src.graph import CustomerSupportGraph
 
+# Shared worker pool for speculative retrieval
+_SPECULATION_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
 
 class CustomerSupportChatbot:
     """Main chatbot interface"""
@@ -40,8 +44,37 @@ class CustomerSupportChatbot:
         Returns:
             Dictionary with routing info and response
         """
-        state = self.graph.process(user_query)
+        # Speculatively start retrieval while intent + sentiment run, so
+        # BUCKET_B queries find their documents already fetched (skipped when
+        # the router already settles the query without RAG). The intent node
+        # reuses the pre-check's routing result.
+        retrieve_node = self.graph.retrieve_node
+        try:
+            if self.graph.should_prefetch_retrieval(user_query):
+                retrieve_node.prefetch_async(user_query, _SPECULATION_EXECUTOR)
+            state = self.graph.process(user_query)
+        finally:
+            self.graph.intent_node.discard([user_query])
+            retrieve_node.discard([user_query])
+        
+        return self._format_result(user_query, state)
+    
+    def chat_batch(self, queries: list) -> list:
+        """
+        Process several user queries as one batch
         
+        Args:
+            queries: List of user questions
+            
+        Returns:
+            List of result dictionaries (same order as queries)
+        """
+        states = self.graph.process_batch(queries)
+        return [self._format_result(query, state) for query, state in zip(queries, states)]
+    
+    @staticmethod
+    def _format_result(user_query: str, state: dict) -> dict:
+        """Extract routing info and response from a final graph state"""
         return {
             'user_message': user_query,
             'intent': state['predicted_intent'],
@@ -71,6 +104,12 @@ def interactive_chat():
     print("="*80)
     print("Type 'quit', 'exit', or 'q' to end the session\n")
     
+    # Line editing and history for input() (not available on Windows)
+    try:
+        import readline  # noqa: F401
+    except ImportError:
+        pass
+    
     chatbot = CustomerSupportChatbot()
     
     while True:
@@ -154,9 +154,9 @@ class GenerateNode:
         """
         Generate response for BUCKET_A (no LLM needed)
         
-        Note: If the template is missing, the graph's _should_retrieve() method
-        will have already routed this to BUCKET_B (RAG), so this method
-        will only be called if the template exists.
+        Note: If the template is missing, IntentNode will have already
+        relabeled the query BUCKET_B (RAG), so this method will only be
+        called if the template exists.
         
         Args:
             state: Current state
@@ -164,8 +164,8 @@ class GenerateNode:
         Returns:
             Direct response
         """
-        state['llm_usage'] = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
-        intent = state['predicted_intent']
+        state.llm_usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        intent = state.predicted_intent
         return get_direct_response(intent)
     
     def _generate_bucket_b_response(self, state: ChatbotState) -> str:
@@ -180,28 +180,51 @@ class GenerateNode:
         """
         llm = self.llm_factory.get_llm_for_bucket('BUCKET_B')
         
-        # Create messages
+        # Generate response
+        response = llm.invoke(self._bucket_b_messages(state), config=self._llm_config())
+        
+        return self._finish_bucket_b_response(state, response)
+    
+    async def _agenerate_bucket_b_response(self, state: ChatbotState) -> str:
+        """
+        Async version of _generate_bucket_b_response (uses the shared async
+        Groq connection pool instead of blocking a worker thread)
+        
+        Args:
+            state: Current state
+            
+        Returns:
+            Generated response
+        """
+        llm = self.llm_factory.get_llm_for_bucket('BUCKET_B')
+        
+        # Generate response
+        response = await llm.ainvoke(self._bucket_b_messages(state), config=self._llm_config())
+        
+        return self._finish_bucket_b_response(state, response)
+    
+    def _bucket_b_messages(self, state: ChatbotState) -> list:
+        """System + user messages for a RAG answer"""
         system_msg = SystemMessage(content=RAG_SYSTEM_PROMPT)
         user_msg = HumanMessage(
             content=get_rag_prompt(
-                state['retrieved_context'],
-                state['user_query']
+                state.retrieved_context,
+                state.user_query
             )
         )
-        
-        # Generate response
-        if self._callbacks:
-            response = llm.invoke([system_msg, user_msg], config={"callbacks": self._callbacks})
-        else:
-            response = llm.invoke([system_msg, user_msg])
-
+        return [system_msg, user_msg]
+    
+    def _llm_config(self):
+        """Runnable config for LLM calls (tracing callbacks when enabled)"""
+        return {"callbacks": self._callbacks} if self._callbacks else None
+    
+    def _finish_bucket_b_response(self, state: ChatbotState, response) -> str:
+        """Record token usage and clean the LLM output"""
         # Store token usage for cost calculation
-        state['llm_usage'] = self._extract_usage(response)
+        state.llm_usage = self._extract_usage(response)
         
         # Clean response (remove thinking tags, formatting issues)
-        cleaned_response = self._clean_response(response.content)
-        
-        return cleaned_response
+        return self._clean_response(response.content)
     
     def _generate_bucket_c_response(self, state: ChatbotState) -> str:
         """
@@ -215,8 +238,8 @@ class GenerateNode:
         """
         # For now, return escalation message
         # Can be extended to use GPT-4 or route to human
-        state['llm_usage'] = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
-        intent = state['predicted_intent']
+        state.llm_usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        intent = state.predicted_intent
         
         escalation_messages = {
             'complaint': "I understand you're experiencing an issue and I sincerely apologize for any inconvenience. I'm connecting you with a senior support specialist who can better assist you and ensure your concern is fully addressed.",
@@ -243,32 +266,57 @@ class GenerateNode:
         Returns:
             Updated state with final response
         """
-        bucket = state['bucket']
+        bucket = state.bucket
         
         print(f"  → Generating response for {bucket}...")
         
         # Generate based on bucket
-        if bucket == 'BUCKET_A':
-            response = self._generate_bucket_a_response(state)
-        
-        elif bucket == 'BUCKET_B':
+        if bucket == 'BUCKET_B':
             response = self._generate_bucket_b_response(state)
+        else:
+            response = self._generate_without_llm(state)
+        
+        return self._update_state(state, response)
+    
+    async def acall(self, state: ChatbotState) -> ChatbotState:
+        """
+        Async generation used by ainvoke (awaits the LLM call on the event loop)
+        
+        Args:
+            state: Current chatbot state
+            
+        Returns:
+            Updated state with final response
+        """
+        bucket = state.bucket
         
-        elif bucket == 'BUCKET_C':
-            response = self._generate_bucket_c_response(state)
+        print(f"  → Generating response for {bucket}...")
         
+        if bucket == 'BUCKET_B':
+            response = await self._agenerate_bucket_b_response(state)
         else:
-            response = "I apologize, but I'm unable to process your request at the moment. Please contact our support team directly."
+            response = self._generate_without_llm(state)
         
+        return self._update_state(state, response)
+    
+    def _generate_without_llm(self, state: ChatbotState) -> str:
+        """Response for the buckets answered without an LLM call (A, C, unknown)"""
+        if state.bucket == 'BUCKET_A':
+            return self._generate_bucket_a_response(state)
+        
+        elif state.bucket == 'BUCKET_C':
+            return self._generate_bucket_c_response(state)
+        
+        return "I apologize, but I'm unable to process your request at the moment. Please contact our support team directly."
+    
+    def _update_state(self, state: ChatbotState, response: str) -> ChatbotState:
+        """Store the final response and extend the conversation history"""
         # Update state
-        state['final_response'] = response
+        state.final_response = response
         
         # Update conversation history
-        if 'messages' not in state:
-            state['messages'] = []
-        
-        state['messages'].append(HumanMessage(content=state['user_query']))
-        state['messages'].append(AIMessage(content=response))
+        state.messages.append(HumanMessage(content=state.user_query))
+        state.messages.append(AIMessage(content=response))
         
         print(f"  ✓ Response generated")
         
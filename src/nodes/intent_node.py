@@ -6,6 +6,7 @@ Routes user query through intent classifier.
 """
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -13,9 +14,29 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from intent_router import IntentRouter
 from src.state import ChatbotState
+from src.llm.prompts import has_direct_response
 from transformers import pipeline
 
 
+@lru_cache(maxsize=1)
+def _get_intent_router() -> IntentRouter:
+    """Process-wide IntentRouter (classifier pickles are loaded once)"""
+    return IntentRouter()
+
+
+@lru_cache(maxsize=1)
+def _get_sentiment_pipeline():
+    """Process-wide sentiment pipeline (loaded on first use)"""
+    print("  → Loading sentiment analyzer...")
+    analyzer = pipeline(
+        "sentiment-analysis",
+        model="distilbert-base-uncased-finetuned-sst-2-english",
+        device=-1  # CPU
+    )
+    print("  ✓ Sentiment analyzer loaded")
+    return analyzer
+
+
 class IntentNode:
     """Node for intent classification and routing with sentiment analysis"""
     
@@ -30,23 +51,23 @@ class IntentNode:
     
     def __init__(self):
         """Initialize intent router and sentiment analyzer"""
-        self.router = IntentRouter()
+        self.router = _get_intent_router()  # Shared across graph instances
         
         # Load sentiment analyzer (lazy loading - only loads on first use)
         self.sentiment_analyzer = None
         
+        # Batch-computed (routing, sentiment) results keyed by query
+        self._prefetched = {}
+        
+        # Routing results computed ahead of the graph (see route), keyed by query
+        self._routed = {}
+        
         print("  ✓ Intent classification node initialized")
     
     def _get_sentiment_analyzer(self):
         """Lazy load sentiment analyzer"""
         if self.sentiment_analyzer is None:
-            print("  → Loading sentiment analyzer...")
-            self.sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english",
-                device=-1  # CPU
-            )
-            print("  ✓ Sentiment analyzer loaded")
+            self.sentiment_analyzer = _get_sentiment_pipeline()
         return self.sentiment_analyzer
     
     def _analyze_sentiment(self, message: str) -> dict:
@@ -57,7 +78,10 @@ class IntentNode:
         """
         analyzer = self._get_sentiment_analyzer()
         sentiment = analyzer(message)[0]
-        
+        return self._apply_anger_filter(message, sentiment)
+    
+    def _apply_anger_filter(self, message: str, sentiment: dict) -> dict:
+        """Correct a raw DistilBERT prediction using anger keywords"""
         # Check for anger keywords
         message_lower = message.lower()
         has_anger = any(keyword in message_lower for keyword in self.ANGER_KEYWORDS)
@@ -77,6 +101,49 @@ class IntentNode:
             'has_anger': has_anger
         }
     
+    def prefetch(self, queries: list):
+        """
+        Classify and analyze sentiment for a batch of queries up front
+        
+        The intent classifier and the sentiment model each run once over the
+        whole batch; __call__ then picks up the stored results per query.
+        
+        Args:
+            queries: List of user queries
+        """
+        routing_results = self.router.batch_route(queries)
+        sentiments = self._get_sentiment_analyzer()(list(queries))
+        
+        for query, routing_result, sentiment in zip(queries, routing_results, sentiments):
+            self._prefetched[query] = (routing_result, self._apply_anger_filter(query, sentiment))
+    
+    def route(self, query: str) -> dict:
+        """
+        Route a query ahead of the graph run
+        
+        __call__ reuses the stored result instead of routing the query again.
+        
+        Args:
+            query: User query
+            
+        Returns:
+            Routing result (as from IntentRouter.route_message)
+        """
+        routing_result = self.router.route_message(query)
+        self._routed[query] = routing_result
+        return routing_result
+    
+    def peek_routing(self, query: str):
+        """Prefetched routing result for a query (None if not prefetched)"""
+        prefetched = self._prefetched.get(query)
+        return prefetched[0] if prefetched is not None else None
+    
+    def discard(self, queries: list):
+        """Drop prefetched results that were not consumed"""
+        for query in queries:
+            self._prefetched.pop(query, None)
+            self._routed.pop(query, None)
+    
     def __call__(self, state: ChatbotState) -> ChatbotState:
         """
         Classify intent, analyze sentiment, and determine routing bucket
@@ -87,16 +154,21 @@ class IntentNode:
         Returns:
             Updated state with routing information and sentiment
         """
-        query = state['user_query']
-        
-        print(f"  → Classifying intent...")
-        
-        # Route message
-        routing_result = self.router.route_message(query)
+        query = state.user_query
         
-        # Analyze sentiment
-        print(f"  → Analyzing sentiment...")
-        sentiment_result = self._analyze_sentiment(query)
+        prefetched = self._prefetched.pop(query, None)
+        if prefetched is not None:
+            routing_result, sentiment_result = prefetched
+        else:
+            # Route message (unless already routed by route)
+            routing_result = self._routed.pop(query, None)
+            if routing_result is None:
+                print(f"  → Classifying intent...")
+                routing_result = self.router.route_message(query)
+            
+            # Analyze sentiment
+            print(f"  → Analyzing sentiment...")
+            sentiment_result = self._analyze_sentiment(query)
         
         # Determine if escalation is needed (Hybrid approach)
         is_negative = sentiment_result['label'] == 'NEGATIVE'
@@ -118,17 +190,25 @@ class IntentNode:
             routing_result['cost_tier'] = 'high'
             routing_result['action'] = 'escalate_sentiment'
         
+        # BUCKET_A without a direct-response template falls back to RAG. Done
+        # here rather than in the graph's conditional edge, whose state
+        # changes LangGraph does not keep.
+        if routing_result['bucket'] == 'BUCKET_A' and not has_direct_response(routing_result['predicted_intent']):
+            print(f"  ⚠️  Template missing for '{routing_result['predicted_intent']}' → Routing to RAG (BUCKET_B)")
+            routing_result['bucket'] = 'BUCKET_B'
+            routing_result['cost_tier'] = 'low'
+        
         # Update state with routing info
-        state['predicted_intent'] = routing_result['predicted_intent']
-        state['confidence'] = routing_result['confidence']
-        state['bucket'] = routing_result['bucket']
-        state['cost_tier'] = routing_result['cost_tier']
-        state['action'] = routing_result['action']
+        state.predicted_intent = routing_result['predicted_intent']
+        state.confidence = routing_result['confidence']
+        state.bucket = routing_result['bucket']
+        state.cost_tier = routing_result['cost_tier']
+        state.action = routing_result['action']
         
         # Update state with sentiment info
-        state['sentiment_label'] = sentiment_result['label']
-        state['sentiment_score'] = sentiment_result['score']
-        state['has_anger_keywords'] = sentiment_result['has_anger']
+        state.sentiment_label = sentiment_result['label']
+        state.sentiment_score = sentiment_result['score']
+        state.has_anger_keywords = sentiment_result['has_anger']
         
         print(f"  ✓ Intent: {routing_result['predicted_intent']} "
               f"({routing_result['confidence']:.1%} confidence)")
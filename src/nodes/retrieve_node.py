@@ -5,8 +5,23 @@ RAG Retrieval Node
 Retrieves relevant documents from FAISS.
 """
 
-from src.retriever import RAGRetriever
-from src.state import ChatbotState
+import asyncio
+import logging
+from concurrent.futures import Future
+from functools import lru_cache
+
+from src.retriever import RAGRetriever, BatchingRetriever
+from src.state import ChatbotState, RetrievedDocs, empty_retrieved_docs
+from src.config import RETRIEVAL_PARAMS_BY_BUCKET
+
+# Logging instead of print: this node is on the per-request hot path
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _get_retriever() -> RAGRetriever:
+    """Process-wide RAG retriever (embedding model + FAISS index loaded once)"""
+    return RAGRetriever()
 
 
 class RetrieveNode:
@@ -15,15 +30,67 @@ class RetrieveNode:
     def __init__(self):
         """Initialize RAG retriever"""
         try:
-            self.retriever = RAGRetriever()
-            print("  ✓ RAG retrieval node initialized")
+            self.retriever = _get_retriever()  # Shared across graph instances
+            self.batcher = BatchingRetriever(self.retriever)  # Coalesces concurrent async requests
+            logger.debug("RAG retrieval node initialized")
         except Exception as e:
-            print(f"  ⚠ Warning: RAG retrieval initialization failed: {e}")
+            logger.warning("RAG retrieval initialization failed: %s", e)
             self.retriever = None
+            self.batcher = None
+        
+        # Per-bucket (top_k, nprobe) resolved against the loaded index
+        self._params_by_bucket = {}
+        if self.retriever is not None:
+            self._params_by_bucket = {
+                bucket: (top_k, self.retriever.scaled_nprobe(nprobe_scale))
+                for bucket, (top_k, nprobe_scale) in RETRIEVAL_PARAMS_BY_BUCKET.items()
+            }
+        
+        # Speculatively started retrievals keyed by query
+        self._prefetched = {}
+    
+    def prefetch_async(self, query: str, executor):
+        """
+        Start retrieval for a query in the background
+        
+        Lets FAISS search overlap with intent classification and sentiment
+        analysis; __call__ picks up the result if the query is routed to RAG.
+        
+        Args:
+            query: User query
+            executor: concurrent.futures executor to run the retrieval on
+        """
+        if self.retriever is None:
+            return
+        self._prefetched[query] = executor.submit(
+            self.retriever.retrieve_and_format, query, *self._search_params('BUCKET_B')
+        )
+    
+    def prefetch(self, queries: list):
+        """
+        Retrieve documents and context for a batch of queries with one FAISS search
+        
+        __call__ picks up the stored results per query.
+        
+        Args:
+            queries: List of user queries
+        """
+        if self.retriever is None or not queries:
+            return
+        results = self.retriever.batch_search(queries, *self._search_params('BUCKET_B'))
+        for query, result in zip(queries, results):
+            self._prefetched[query] = result
+    
+    def discard(self, queries: list):
+        """Drop (and cancel if not yet started) unused speculative retrievals"""
+        for query in queries:
+            pending = self._prefetched.pop(query, None)
+            if isinstance(pending, Future):
+                pending.cancel()
     
     def __call__(self, state: ChatbotState) -> ChatbotState:
         """
-        Retrieve relevant documents from Pinecone
+        Retrieve relevant documents from FAISS
         
         Args:
             state: Current chatbot state
@@ -32,25 +99,78 @@ class RetrieveNode:
             Updated state with retrieved documents
         """
         if self.retriever is None:
-            state['retrieved_documents'] = []
-            state['retrieved_context'] = "No retrieval system available."
+            state.retrieved_documents = empty_retrieved_docs()
+            state.retrieved_context = "No retrieval system available."
             return state
         
-        query = state['user_query']
-        intent = state.get('predicted_intent')
+        query = state.user_query
         
-        print(f"  → Retrieving relevant documents from FAISS...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieving relevant documents from FAISS for %r", query)
         
-        # Retrieve documents
-        documents = self.retriever.retrieve(query)
+        # Retrieve documents (reuse a batched or speculative retrieval if available)
+        pending = self._prefetched.pop(query, None)
+        if isinstance(pending, Future):
+            documents, context = pending.result()
+        elif pending is not None:
+            documents, context = pending
+        else:
+            top_k, nprobe = self._search_params(state.bucket)
+            documents, context = self.retriever.retrieve_and_format(query, top_k=top_k, nprobe=nprobe)
         
-        # Format context
-        context = self.retriever.format_context(documents)
+        return self._update_state(state, documents, context)
+    
+    async def acall(self, state: ChatbotState) -> ChatbotState:
+        """
+        Async retrieval used by ainvoke: concurrent requests share one FAISS search
+        
+        Args:
+            state: Current chatbot state
+            
+        Returns:
+            Updated state with retrieved documents
+        """
+        if self.retriever is None:
+            state.retrieved_documents = empty_retrieved_docs()
+            state.retrieved_context = "No retrieval system available."
+            return state
+        
+        query = state.user_query
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieving relevant documents from FAISS for %r", query)
+        
+        pending = self._prefetched.pop(query, None)
+        if isinstance(pending, Future):
+            documents, context = await asyncio.wrap_future(pending)
+        elif pending is not None:
+            documents, context = pending
+        else:
+            top_k, nprobe = self._search_params(state.bucket)
+            documents, context = await self.batcher.submit(query, top_k=top_k, nprobe=nprobe)
+        
+        return self._update_state(state, documents, context)
+    
+    def _search_params(self, bucket: str) -> tuple:
+        """
+        (top_k, nprobe) to retrieve with for a routing bucket
+        
+        Speculative retrievals use BUCKET_B's: every query that reaches this
+        node is in BUCKET_B (see IntentNode), so both paths share cache keys.
+        """
+        return self._params_by_bucket.get(bucket, (None, None))
+    
+    def _update_state(self, state: ChatbotState, documents: RetrievedDocs, context: str = None) -> ChatbotState:
+        """Store retrieved documents and their formatted context in the state"""
+        # Format context (unless it came fused with the retrieval)
+        if context is None:
+            context = self.retriever.format_context(documents)
         
         # Update state
-        state['retrieved_documents'] = documents
-        state['retrieved_context'] = context
+        state.retrieved_documents = documents
+        state.retrieved_context = context
         
-        print(f"  ✓ Retrieved {len(documents)} documents")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retrieved %d documents", len(documents['ids']))
         
         return state
@@ -12,18 +12,37 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+import asyncio
+import io
 import json
+import threading
 import numpy as np
 import faiss
+from collections import OrderedDict
 from functools import lru_cache
 from sentence_transformers import SentenceTransformer
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.config import (
     FAISS_INDEX_PATH,
     FAISS_METADATA_PATH,
     EMBEDDING_MODEL,
-    TOP_K_RETRIEVAL
+    TOP_K_RETRIEVAL,
+    RETRIEVAL_MAX_BATCH_SIZE,
+    RETRIEVAL_MAX_LATENCY_MS,
+    QUERY_CACHE_SIZE,
+    FAISS_NPROBE,
+    FAISS_MMAP,
+    FAISS_PREFETCH_HOT_LISTS,
+    FAISS_PREFETCH_HOT_LISTS_K,
+    FAISS_PREFETCH_SAMPLE_SIZE
 )
+from src.state import RetrievedDocs
+from src.faiss_runtime import configure_threads, gpu_available, index_to_gpu, simd_level
 
 
 class RAGRetriever:
@@ -39,7 +58,15 @@ class RAGRetriever:
         print(f"Loading embedding model: {EMBEDDING_MODEL}...")
         self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
         self.top_k = top_k
-        self._embedding_cache = {}  # Cache for query embeddings
+        
+        # Per-instance LRU caches keyed on normalized query text. Search results
+        # live in an OrderedDict (not lru_cache) so batch_search can look up
+        # and store entries as well.
+        self._embed = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._encode_query)
+        self._results = OrderedDict()  # (text, k, nprobe) -> (RetrievedDocs, context)
+        self._results_lock = threading.Lock()
+        self._tls = threading.local()  # Per-thread reusable search output buffers
+        configure_threads()
         
         # Load FAISS index
         print("Loading FAISS index...")
@@ -49,8 +76,38 @@ class RAGRetriever:
                 f"Run build_rag_index.py first."
             )
         
-        self.index = faiss.read_index(str(FAISS_INDEX_PATH))
-        print(f"  ✓ Loaded FAISS index ({self.index.ntotal} vectors)")
+        # Memory-map the IVF lists: pages are shared across uvicorn worker
+        # processes and loaded on demand instead of copied into RAM (pointless
+        # if the index is copied to GPU memory anyway). IO_FLAG_MMAP_IFC must
+        # not be added: its reader can't load IVF lists ("mmap only supported
+        # for File objects").
+        use_gpu = gpu_available()
+        io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if FAISS_MMAP and not use_gpu else 0
+        self.index = faiss.read_index(str(FAISS_INDEX_PATH), io_flags)
+        print(f"  ✓ Loaded FAISS index ({self.index.ntotal} vectors, {simd_level()} kernels)")
+        
+        # Scores assume cosine similarity = inner product on unit vectors
+        if self.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            print(f"  ⚠ FAISS index is not inner-product; rebuild it with build_rag_index.py")
+        
+        # Query-time IVF parameter (not persisted in the index file)
+        ivf_index = faiss.try_extract_index_ivf(self.index)
+        self.default_nprobe = None
+        if ivf_index is not None:
+            ivf_index.nprobe = FAISS_NPROBE or max(1, ivf_index.nlist // 32)
+            self.default_nprobe = ivf_index.nprobe
+            print(f"  ✓ IVF search: nprobe={ivf_index.nprobe} of {ivf_index.nlist} lists")
+        
+        # Per-call nprobe (SearchParametersIVF) needs a CPU index that is itself IVF.
+        # try_extract_index_ivf returns a new wrapper object, so compare by type.
+        self._per_call_nprobe = isinstance(self.index, faiss.IndexIVF) and not use_gpu
+        cpu_ivf_index = ivf_index if not use_gpu else None
+        
+        # Serve from GPU when available (nprobe is carried over by the clone);
+        # batched searches amortize the host/device copies
+        self.gpu_resources = None
+        if use_gpu:
+            self.index, self.gpu_resources = index_to_gpu(self.index)
         
         # Load metadata
         print("Loading metadata...")
@@ -59,97 +116,402 @@ class RAGRetriever:
                 f"Metadata not found at {FAISS_METADATA_PATH}"
             )
         
-        with open(FAISS_METADATA_PATH, 'r', encoding='utf-8') as f:
-            self.metadata = json.load(f)
-        print(f"  ✓ Loaded {len(self.metadata)} metadata entries\n")
+        if orjson is not None:
+            with open(FAISS_METADATA_PATH, 'rb') as f:
+                self.metadata = orjson.loads(f.read())
+        else:
+            with open(FAISS_METADATA_PATH, 'r', encoding='utf-8') as f:
+                self.metadata = json.load(f)
+        
+        # Struct-of-arrays view of the metadata used to assemble results
+        self._doc_ids = np.array([entry['id'] for entry in self.metadata])
+        self._doc_texts = [
+            f"Question: {entry['metadata']['instruction']}\nAnswer: {entry['metadata']['response']}"
+            for entry in self.metadata
+        ]
+        print(f"  ✓ Loaded {len(self.metadata)} metadata entries")
+        
+        if FAISS_PREFETCH_HOT_LISTS and cpu_ivf_index is not None:
+            self._prefetch_hot_lists(cpu_ivf_index)
+        print()
     
-    def create_query_embedding(self, query):
+    def _prefetch_hot_lists(self, ivf_index):
         """
-        Create embedding for query text with caching
+        Page in the inverted lists most queries will hit before the first request
+        
+        A sample of the indexed instructions stands in for user queries: the
+        FAISS_PREFETCH_HOT_LISTS_K lists they probe most often are prefetched
+        (a background read for memory-mapped or on-disk lists; a no-op for
+        lists already in RAM).
         
         Args:
-            query: Query string
-            
-        Returns:
-            Embedding vector (numpy array)
+            ivf_index: CPU IndexIVF whose lists to prefetch
         """
-        # Check cache first
-        if query in self._embedding_cache:
-            return self._embedding_cache[query]
+        if not self.metadata or FAISS_PREFETCH_HOT_LISTS_K <= 0:
+            return
         
-        # Generate embedding
-        embedding = self.embedding_model.encode(
-            query,
+        # Fixed seed: the same lists are warmed on every worker and restart
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(self.metadata), size=min(FAISS_PREFETCH_SAMPLE_SIZE, len(self.metadata)), replace=False)
+        query_vectors = self.embedding_model.encode(
+            [self.metadata[i]['metadata']['instruction'] for i in sample],
             convert_to_numpy=True,
+            normalize_embeddings=True,
             show_progress_bar=False
-        )
+        ).astype('float32', copy=False)
         
-        # Cache it (limit cache size to prevent memory issues)
-        if len(self._embedding_cache) < 1000:
-            self._embedding_cache[query] = embedding
+        # Count how often each list is probed and keep the top K by count
+        _, list_ids = ivf_index.quantizer.search(query_vectors, ivf_index.nprobe)
+        ids, counts = np.unique(list_ids[list_ids >= 0], return_counts=True)
+        top = np.argsort(-counts, kind='stable')[:FAISS_PREFETCH_HOT_LISTS_K]
+        hot_lists = np.sort(ids[top]).astype('int64')  # Ascending list ids read sequentially
         
+        ivf_index.invlists.prefetch_lists(faiss.swig_ptr(hot_lists), len(hot_lists))
+        print(f"  ✓ Prefetched {len(hot_lists)} of {ivf_index.nlist} IVF lists "
+              f"(most probed by {len(sample)} sampled instructions)")
+    
+    @staticmethod
+    def _normalize_query(query):
+        """Cache key for a query (the MiniLM tokenizer is uncased, so case is irrelevant)"""
+        return query.strip().lower()
+    
+    def _encode_query(self, text):
+        """Encode normalized query text to a unit vector (wrapped in an LRU cache in __init__)"""
+        embedding = self.embedding_model.encode(
+            text,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype('float32', copy=False)
+        embedding.setflags(write=False)  # Shared between cache hits
         return embedding
     
-    def retrieve(self, query, top_k=None):
+    def create_query_embedding(self, query):
+        """
+        Create embedding for query text with caching
+        
+        Args:
+            query: Query string
+            
+        Returns:
+            Unit-normalized embedding vector (read-only float32 numpy array)
+        """
+        return self._embed(self._normalize_query(query))
+    
+    def retrieve(self, query, top_k=None, nprobe=None):
         """
         Retrieve top-k most relevant documents
         
+        Repeated queries are answered from an LRU cache without touching the
+        encoder or the index.
+        
         Args:
             query: Query string
             top_k: Override default top_k
+            nprobe: Override the IVF lists scanned for this search
+            
+        Returns:
+            RetrievedDocs with parallel 'ids', 'scores' and 'texts'
+        """
+        k = top_k or self.top_k
+        documents, _ = self._search(self._normalize_query(query), k, self._effective_nprobe(nprobe))
+        return RetrievedDocs(documents)
+    
+    def retrieve_and_format(self, query, top_k=None, nprobe=None):
+        """
+        Retrieve top-k documents together with their formatted context
+        
+        Both are built in one pass over the search results and cached
+        together, so hot queries skip formatting as well.
+        
+        Args:
+            query: Query string
+            top_k: Override default top_k
+            nprobe: Override the IVF lists scanned for this search
+            
+        Returns:
+            Tuple of (RetrievedDocs, context string as from format_context)
+        """
+        k = top_k or self.top_k
+        documents, context = self._search(self._normalize_query(query), k, self._effective_nprobe(nprobe))
+        return RetrievedDocs(documents), context
+    
+    def scaled_nprobe(self, scale):
+        """
+        nprobe scanning a fraction of the index's default lists
+        
+        Args:
+            scale: Fraction of the default nprobe (None or 1 = default)
+            
+        Returns:
+            nprobe for retrieve/batch_search, or None for the index default
+            (also when FAISS_NPROBE is set explicitly or the index is not IVF)
+        """
+        if not scale or scale == 1 or FAISS_NPROBE or not self._per_call_nprobe:
+            return None
+        return max(1, round(self.default_nprobe * scale))
+    
+    def _effective_nprobe(self, nprobe):
+        """nprobe to search with (None = index default, also when not overridable)"""
+        return nprobe if nprobe and self._per_call_nprobe else None
+    
+    def _search_params(self, nprobe):
+        """Per-call search parameters (thread-safe, unlike setting index.nprobe)"""
+        return faiss.SearchParametersIVF(nprobe=nprobe) if nprobe else None
+    
+    def _cached_result(self, key):
+        """Cached (RetrievedDocs, context) for a (text, k, nprobe) key, or None"""
+        with self._results_lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+    
+    def _cache_result(self, key, result):
+        """Store a search result, evicting the least recently used beyond QUERY_CACHE_SIZE"""
+        with self._results_lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            if len(self._results) > QUERY_CACHE_SIZE:
+                self._results.popitem(last=False)
+    
+    def _search(self, text, k, nprobe=None):
+        """Cached _search_query for normalized query text"""
+        key = (text, k, nprobe)
+        result = self._cached_result(key)
+        if result is None:
+            result = self._search_query(text, k, nprobe)
+            self._cache_result(key, result)
+        return result
+    
+    def _search_query(self, text, k, nprobe=None):
+        """Search the index for normalized query text (uncached, see _search)"""
+        # Unit-normalized query embedding, as a (1, d) matrix (a view, no copy)
+        query_vector = self._embed(text)[np.newaxis, :]
+        
+        # Search FAISS index into this thread's preallocated output buffers
+        scores, indices = self._search_buffers(k)
+        self.index.search(query_vector, k, params=self._search_params(nprobe), D=scores, I=indices)
+        
+        # _format_results_with_context copies what it keeps, so the buffers can be reused
+        return self._format_results_with_context(scores[0], indices[0])
+    
+    def _search_buffers(self, k):
+        """Thread-local (1, k) score and id arrays for single-query search"""
+        buffers = getattr(self._tls, 'buffers', None)
+        if buffers is None or buffers[0].shape[1] != k:
+            buffers = (np.empty((1, k), dtype='float32'), np.empty((1, k), dtype='int64'))
+            self._tls.buffers = buffers
+        return buffers
+    
+    def batch_search(self, queries, top_k=None, nprobe=None):
+        """
+        Retrieve top-k documents and their context for several queries at once
+        
+        Queries in the LRU cache are answered from it; the remaining distinct
+        queries are encoded in one call and searched with a single
+        index.search on the query matrix (which FAISS parallelizes), and
+        their results are added to the cache.
+        
+        Args:
+            queries: List of query strings
+            top_k: Override default top_k
+            nprobe: Override the IVF lists scanned for this search
             
         Returns:
-            List of dicts with 'id', 'score', 'metadata'
+            List of (RetrievedDocs, context) tuples (same as
+            retrieve_and_format), one per query
         """
+        if not queries:
+            return []
+        
         k = top_k or self.top_k
+        nprobe = self._effective_nprobe(nprobe)
+        keys = [(self._normalize_query(query), k, nprobe) for query in queries]
         
-        # Create query embedding
-        query_embedding = self.create_query_embedding(query)
+        results = {}
+        for key in keys:
+            if key not in results:
+                cached = self._cached_result(key)
+                if cached is not None:
+                    results[key] = cached
+        misses = [key for key in dict.fromkeys(keys) if key not in results]
         
-        # Convert to numpy array and normalize
-        query_vector = np.array([query_embedding], dtype='float32')
-        faiss.normalize_L2(query_vector)
+        if misses:
+            query_vectors = self.embedding_model.encode(
+                [text for text, _, _ in misses],
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            ).astype('float32', copy=False)
+            
+            scores, indices = self.index.search(query_vectors, k, params=self._search_params(nprobe))
+            
+            for i, key in enumerate(misses):
+                results[key] = self._format_results_with_context(scores[i], indices[i])
+                self._cache_result(key, results[key])
         
-        # Search FAISS index
-        scores, indices = self.index.search(query_vector, k)
+        # Copy the dict per caller: cached entries are shared
+        return [
+            (RetrievedDocs(results[key][0]), results[key][1])
+            for key in keys
+        ]
+    
+    def _format_results(self, scores, indices):
+        """
+        Convert one row of FAISS search output to a RetrievedDocs
         
-        # Format results
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.metadata):  # Valid index
-                results.append({
-                    'id': self.metadata[idx]['id'],
-                    'score': float(scores[0][i]),
-                    'metadata': self.metadata[idx]['metadata']
-                })
+        Args:
+            scores: Similarity scores for one query
+            indices: Vector ids for one query (-1 when fewer than k were found)
+            
+        Returns:
+            RetrievedDocs with parallel 'ids', 'scores' and 'texts'
+        """
+        valid = (indices >= 0) & (indices < len(self.metadata))
+        indices = indices[valid]
         
-        return results
+        return RetrievedDocs(
+            ids=self._doc_ids[indices],
+            scores=scores[valid],
+            texts=[self._doc_texts[idx] for idx in indices]
+        )
+    
+    def _format_results_with_context(self, scores, indices):
+        """
+        Convert one row of FAISS search output to a RetrievedDocs and its
+        formatted context in a single loop
+        
+        Args:
+            scores: Similarity scores for one query
+            indices: Vector ids for one query (-1 when fewer than k were found)
+            
+        Returns:
+            Tuple of (RetrievedDocs, context string)
+        """
+        valid = (indices >= 0) & (indices < len(self.metadata))
+        indices = indices[valid]
+        
+        if len(indices) == 0:
+            return self._format_results(scores, indices), self.format_context({'texts': []})
+        
+        texts = []
+        context = io.StringIO()
+        for i, idx in enumerate(indices, 1):
+            text = self._doc_texts[idx]
+            texts.append(text)
+            if i > 1:
+                context.write("\n\n")
+            context.write(f"[Context {i}]\n")
+            context.write(text)
+        
+        documents = RetrievedDocs(
+            ids=self._doc_ids[indices],
+            scores=scores[valid],
+            texts=texts
+        )
+        return documents, context.getvalue()
     
     def format_context(self, documents):
         """
         Format retrieved documents as context string
         
         Args:
-            documents: List of retrieved documents
+            documents: RetrievedDocs from retrieve
             
         Returns:
             Formatted context string
         """
-        if not documents:
+        if not documents['texts']:
             return "No relevant information found in knowledge base."
         
-        context_parts = []
+        return "\n\n".join(
+            f"[Context {i}]\n{text}"
+            for i, text in enumerate(documents['texts'], 1)
+        )
+
+
+class BatchingRetriever:
+    """
+    Coalesces concurrent async retrievals into batched FAISS searches
+    
+    Queries submitted while a batch is filling (up to max_batch_size, or
+    max_latency_ms after the first one) are encoded and searched together
+    with RAGRetriever.batch_search, then fanned back out to their callers.
+    """
+    
+    def __init__(self, retriever, max_batch_size=RETRIEVAL_MAX_BATCH_SIZE,
+                 max_latency_ms=RETRIEVAL_MAX_LATENCY_MS):
+        """
+        Args:
+            retriever: RAGRetriever to run the batched searches on
+            max_batch_size: Maximum number of queries per FAISS search
+            max_latency_ms: Maximum time to wait for a batch to fill
+        """
+        self.retriever = retriever
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self._queue = None
+        self._worker = None
+    
+    def _ensure_worker(self):
+        """Start the batching coroutine on the running event loop if needed"""
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not asyncio.get_running_loop():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._drain())
+    
+    async def submit(self, query, top_k=None, nprobe=None):
+        """
+        Retrieve top-k documents for a query as part of a micro-batch
         
-        for i, doc in enumerate(documents, 1):
-            metadata = doc['metadata']
+        Args:
+            query: Query string
+            top_k: Override default top_k
+            nprobe: Override the IVF lists scanned for this search
             
-            context_part = f"""[Context {i}]
-Question: {metadata['instruction']}
-Answer: {metadata['response']}"""
+        Returns:
+            Tuple of (RetrievedDocs, context string) (same as retrieve_and_format)
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((query, (top_k, nprobe), future))
+        return await future
+    
+    async def _drain(self):
+        """Collect queued queries into batches and resolve their futures"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_latency
             
-            context_parts.append(context_part)
-        
-        return "\n\n".join(context_parts)
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # One FAISS search per distinct (top_k, nprobe) in the batch
+            groups = {}
+            for query, params, future in batch:
+                groups.setdefault(params, []).append((query, future))
+            
+            for (top_k, nprobe), group in groups.items():
+                queries = [query for query, _ in group]
+                try:
+                    # Encoding + search block, so keep them off the event loop
+                    results = await asyncio.to_thread(self.retriever.batch_search, queries, top_k, nprobe)
+                except Exception as e:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for (_, future), result in zip(group, results):
+                    if not future.done():
+                        future.set_result(result)
 
 
 def test_retriever():
@@ -173,12 +535,10 @@ def test_retriever():
         
         results = retriever.retrieve(query)
         
-        print(f"\nRetrieved {len(results)} documents:")
-        for i, doc in enumerate(results, 1):
-            print(f"\n{i}. Score: {doc['score']:.4f}")
-            print(f"   Intent: {doc['metadata']['intent']}")
-            print(f"   Q: {doc['metadata']['instruction'][:100]}...")
-            print(f"   A: {doc['metadata']['response'][:100]}...")
+        print(f"\nRetrieved {len(results['ids'])} documents:")
+        for i, (doc_id, score, text) in enumerate(zip(results['ids'], results['scores'], results['texts']), 1):
+            print(f"\n{i}. Score: {score:.4f} ({doc_id})")
+            print(f"   {text[:200]}...")
         
         print(f"\n{'─'*80}")
         print("Formatted Context:")
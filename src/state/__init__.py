@@ -2,6 +2,6 @@
 State Module
 """
 
-from src.state.state import ChatbotState
+from src.state.state import ChatbotState, RetrievedDocs, empty_retrieved_docs
 
-__all__ = ['ChatbotState']
+__all__ = ['ChatbotState', 'RetrievedDocs', 'empty_retrieved_docs']
@@ -5,38 +5,71 @@ State Definitions
 State types for the RAG chatbot graph.
 """
 
-from typing import TypedDict, Annotated, Sequence, List, Dict
+from dataclasses import dataclass, field, fields
+from typing import Annotated, Sequence, List, Dict, TypedDict
+import numpy as np
 from langchain_core.messages import BaseMessage
 
 
-class ChatbotState(TypedDict):
-    """State for RAG chatbot graph"""
+class RetrievedDocs(TypedDict):
+    """Top-k retrieval results as parallel arrays (one entry per document)"""
+    ids: np.ndarray  # Document ids
+    scores: np.ndarray  # Cosine similarity scores (float32)
+    texts: List[str]  # "Question: ...\nAnswer: ..." document texts
+
+
+def empty_retrieved_docs() -> RetrievedDocs:
+    """Retrieval result with no documents"""
+    return RetrievedDocs(
+        ids=np.empty(0, dtype=str),
+        scores=np.empty(0, dtype='float32'),
+        texts=[]
+    )
+
+
+def _empty_usage() -> Dict[str, int]:
+    """Token usage before any LLM call"""
+    return {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+
+@dataclass(slots=True)
+class ChatbotState:
+    """
+    State for RAG chatbot graph
+    
+    A slotted dataclass: nodes use attribute access (fixed slot offsets, no
+    per-instance dict). The compiled graph still returns a plain dict.
+    """
     # User input
-    user_query: str
+    user_query: str = ''
     
     # Intent routing
-    predicted_intent: str
-    confidence: float
-    bucket: str
+    predicted_intent: str = ''
+    confidence: float = 0.0
+    bucket: str = ''
     
     # RAG retrieval
-    retrieved_documents: List[Dict]
-    retrieved_context: str
+    retrieved_documents: RetrievedDocs = field(default_factory=empty_retrieved_docs)
+    retrieved_context: str = ''
     
     # LLM generation
-    final_response: str
+    final_response: str = ''
 
     # LLM usage (tokens)
-    llm_usage: Dict[str, int]
+    llm_usage: Dict[str, int] = field(default_factory=_empty_usage)
     
     # Conversation history
-    messages: Annotated[Sequence[BaseMessage], "conversation history"]
+    messages: Annotated[Sequence[BaseMessage], "conversation history"] = field(default_factory=list)
     
     # Sentiment analysis
-    sentiment_label: str
-    sentiment_score: float
-    has_anger_keywords: bool
+    sentiment_label: str = ''
+    sentiment_score: float = 0.0
+    has_anger_keywords: bool = False
     
     # Metadata
-    cost_tier: str
-    action: str
+    cost_tier: str = ''
+    action: str = ''
+    
+    def to_dict(self) -> dict:
+        """Shallow dict of all fields (same shape as the graph output)"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
@@ -5,29 +5,50 @@ Test FastAPI Endpoint
 Simple script to test the chatbot API.
 """
 
-import requests
+import asyncio
 import json
 
+import httpx
 
-def test_health():
+BASE_URL = "http://localhost:8000"
+
+
+def make_client() -> httpx.AsyncClient:
+    """
+    Shared async client: one keep-alive connection pool for all requests
+
+    HTTP/2 multiplexing is used when the API is served over TLS by an
+    h2-capable server/proxy; plain uvicorn falls back to HTTP/1.1.
+    """
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        http2=True,
+        timeout=60.0,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    )
+
+
+async def test_health(client: httpx.AsyncClient):
     """Test health endpoint"""
+    response = await client.get("/health")
     print("Testing /health endpoint...")
-    response = requests.get("http://localhost:8000/health")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}\n")
 
 
-def test_chat(message: str):
-    """Test chat endpoint"""
-    print(f"Testing /chat with message: '{message}'")
-    
-    response = requests.post(
-        "http://localhost:8000/chat",
+async def post_chat(client: httpx.AsyncClient, message: str) -> httpx.Response:
+    """Send a message to the chat endpoint and return the HTTP response"""
+    return await client.post(
+        "/chat",
         json={"message": message, "session_id": "test-123"}
     )
-    
+
+
+def print_chat_result(message: str, response: httpx.Response):
+    """Print the result of a chat request"""
+    print(f"Testing /chat with message: '{message}'")
     print(f"Status: {response.status_code}")
-    
+
     if response.status_code == 200:
         result = response.json()
         print(f"\n📊 Intent: {result['intent']} ({result['confidence']:.1%} confidence)")
@@ -37,10 +58,15 @@ def test_chat(message: str):
         print(f"Error: {response.text}\n")
 
 
-def test_intents():
+async def test_chat(client: httpx.AsyncClient, message: str):
+    """Test chat endpoint"""
+    print_chat_result(message, await post_chat(client, message))
+
+
+async def test_intents(client: httpx.AsyncClient):
     """Test intents endpoint"""
+    response = await client.get("/intents")
     print("Testing /intents endpoint...")
-    response = requests.get("http://localhost:8000/intents")
     print(f"Status: {response.status_code}")
     result = response.json()
     print(f"Total Intents: {result['total_intents']}")
@@ -49,41 +75,51 @@ def test_intents():
     print()
 
 
-def test_stats():
+async def test_stats(client: httpx.AsyncClient):
     """Test stats endpoint"""
+    response = await client.get("/stats")
     print("Testing /stats endpoint...")
-    response = requests.get("http://localhost:8000/stats")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}\n")
 
 
+async def main():
+    """Run all endpoint tests concurrently over one client"""
+    # Test chat with different queries
+    test_queries = [
+        "How do I track my order?",
+        "I want to cancel my subscription",
+        "I'm very unhappy with your service!"
+    ]
+
+    async with make_client() as client:
+        # All requests are in flight at once; wall time ~ slowest request
+        chat_responses, *_ = await asyncio.gather(
+            asyncio.gather(*[post_chat(client, query) for query in test_queries]),
+            test_health(client),
+            test_intents(client),
+            test_stats(client)
+        )
+
+    # Chat results printed in query order
+    for query, response in zip(test_queries, chat_responses):
+        print("─"*80)
+        print_chat_result(query, response)
+
+
 if __name__ == "__main__":
     print("="*80)
     print("TESTING CUSTOMER SUPPORT CHATBOT API")
     print("="*80)
     print("\nMake sure the API is running: python api.py\n")
-    
+
     try:
-        # Test all endpoints
-        test_health()
-        test_intents()
-        test_stats()
-        
-        # Test chat with different queries
-        test_queries = [
-            "How do I track my order?",
-            "I want to cancel my subscription",
-            "I'm very unhappy with your service!"
-        ]
-        
-        for query in test_queries:
-            print("─"*80)
-            test_chat(query)
-        
+        asyncio.run(main())
+
         print("="*80)
         print("✅ All tests completed!")
         print("="*80)
-    
-    except requests.exceptions.ConnectionError:
+
+    except httpx.ConnectError:
         print("❌ Error: Could not connect to API")
         print("Make sure the API is running: python api.py")
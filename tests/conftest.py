@@ -0,0 +1,86 @@
+"""
+Shared test fixtures
+====================
+
+Small FAISS indexes built with a deterministic stub encoder, so retrieval
+tests run without downloading the sentence-transformers model.
+"""
+
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import EMBEDDING_DIMENSION
+
+
+class StubEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer: one random vector per
+    text, ignoring case like the uncased MiniLM tokenizer
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self.calls = []  # Texts passed to each encode call
+    
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        self.calls.append(texts)
+        
+        vectors = np.stack([
+            np.random.default_rng(zlib.crc32(text.lower().encode())).standard_normal(EMBEDDING_DIMENSION)
+            for text in texts
+        ]).astype('float32')
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+def make_dataset(n_rows):
+    """Bitext-shaped DataFrame with unique instructions"""
+    intents = ['track_order', 'cancel_order', 'check_payment_methods', 'get_refund']
+    return pd.DataFrame({
+        'instruction': [f"question number {i} about {intents[i % 4]}" for i in range(n_rows)],
+        'response': [f"answer number {i}" for i in range(n_rows)],
+        'intent': [intents[i % 4] for i in range(n_rows)],
+        'category': ['ORDER'] * n_rows,
+    })
+
+
+@pytest.fixture
+def build_retriever(tmp_path, monkeypatch):
+    """
+    Factory fixture: build an index with FAISSIndexBuilder into tmp_path and
+    load it with RAGRetriever (both using StubEncoder)
+    """
+    import src.faiss_index_builder as builder_module
+    import src.retriever as retriever_module
+    
+    index_path = tmp_path / "faiss_index"
+    metadata_path = tmp_path / "faiss_metadata.json"
+    for module in (builder_module, retriever_module):
+        monkeypatch.setattr(module, 'SentenceTransformer', StubEncoder)
+        monkeypatch.setattr(module, 'FAISS_INDEX_PATH', index_path)
+        monkeypatch.setattr(module, 'FAISS_METADATA_PATH', metadata_path)
+    
+    def build(index_factory="IVF{nlist},SQ8", n_rows=400):
+        monkeypatch.setattr(builder_module, 'FAISS_INDEX_FACTORY', index_factory)
+        monkeypatch.setattr(builder_module, 'FAISS_PQ_MIN_TRAIN', 0)
+        
+        builder = builder_module.FAISSIndexBuilder()
+        documents, texts = builder.prepare_documents(make_dataset(n_rows))
+        embeddings = builder.create_embeddings(texts)
+        builder.create_index(n_vectors=len(embeddings))
+        builder.index_documents(documents, embeddings)
+        builder.save_index()
+        
+        return retriever_module.RAGRetriever()
+    
+    return build
@@ -0,0 +1,122 @@
+"""
+Tests for BatchingRetriever (async micro-batching of FAISS searches)
+"""
+
+import asyncio
+
+import pytest
+
+from src.retriever import BatchingRetriever
+
+
+QUERIES = [
+    "question number 3 about track_order",
+    "question number 10 about get_refund",
+    "where is my parcel",
+]
+
+
+def _spy_batch_search(retriever):
+    """Record the query lists passed to retriever.batch_search"""
+    calls = []
+    batch_search = retriever.batch_search
+    
+    def spy(queries, *args, **kwargs):
+        calls.append(list(queries))
+        return batch_search(queries, *args, **kwargs)
+    
+    retriever.batch_search = spy
+    return calls
+
+
+def test_concurrent_submits_share_one_batch_search(build_retriever):
+    retriever = build_retriever()
+    calls = _spy_batch_search(retriever)
+    batcher = BatchingRetriever(retriever, max_batch_size=32, max_latency_ms=50)
+    
+    async def run():
+        return await asyncio.gather(*[batcher.submit(query) for query in QUERIES])
+    
+    results = asyncio.run(run())
+    
+    assert calls == [QUERIES]
+    for query, (documents, context) in zip(QUERIES, results):
+        expected_documents, expected_context = retriever.retrieve_and_format(query)
+        assert list(documents['ids']) == list(expected_documents['ids'])
+        assert documents['texts'] == expected_documents['texts']
+        assert context == expected_context
+
+
+def test_batches_are_split_by_search_parameters(build_retriever):
+    retriever = build_retriever()
+    calls = _spy_batch_search(retriever)
+    batcher = BatchingRetriever(retriever, max_batch_size=32, max_latency_ms=50)
+    
+    async def run():
+        return await asyncio.gather(
+            batcher.submit(QUERIES[0], top_k=1),
+            batcher.submit(QUERIES[1], top_k=3),
+            batcher.submit(QUERIES[2], top_k=1),
+        )
+    
+    results = asyncio.run(run())
+    
+    assert sorted(calls) == sorted([[QUERIES[0], QUERIES[2]], [QUERIES[1]]])
+    assert [len(documents['ids']) for documents, _ in results] == [1, 3, 1]
+
+
+def test_max_batch_size_limits_each_search(build_retriever):
+    retriever = build_retriever()
+    calls = _spy_batch_search(retriever)
+    batcher = BatchingRetriever(retriever, max_batch_size=2, max_latency_ms=50)
+    
+    async def run():
+        return await asyncio.gather(*[batcher.submit(query) for query in QUERIES])
+    
+    asyncio.run(run())
+    
+    assert [len(queries) for queries in calls] == [2, 1]
+
+
+def test_search_error_reaches_every_caller(build_retriever):
+    retriever = build_retriever()
+    
+    def failing_batch_search(queries, *args, **kwargs):
+        raise RuntimeError("index unavailable")
+    
+    retriever.batch_search = failing_batch_search
+    batcher = BatchingRetriever(retriever, max_batch_size=32, max_latency_ms=50)
+    
+    async def run():
+        return await asyncio.gather(
+            *[batcher.submit(query) for query in QUERIES],
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run())
+    
+    assert len(results) == len(QUERIES)
+    for result in results:
+        assert isinstance(result, RuntimeError)
+        assert str(result) == "index unavailable"
+
+
+def test_batch_search_answers_cached_queries_without_encoding(build_retriever):
+    retriever = build_retriever()
+    expected = retriever.retrieve_and_format(QUERIES[0])
+    encoder_calls = retriever.embedding_model.calls
+    encoder_calls.clear()
+    
+    results = retriever.batch_search([QUERIES[0], QUERIES[1], QUERIES[1].upper()])
+    
+    # Only the miss is encoded, once for both spellings of it
+    assert encoder_calls == [[QUERIES[1]]]
+    assert list(results[0][0]['ids']) == list(expected[0]['ids'])
+    assert results[0][1] == expected[1]
+    assert results[1][1] == results[2][1]
+    
+    # The batched result is now cached for single-query retrieval too
+    encoder_calls.clear()
+    documents, context = retriever.retrieve_and_format(QUERIES[1])
+    assert encoder_calls == []
+    assert context == results[1][1]
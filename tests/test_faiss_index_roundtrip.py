@@ -0,0 +1,127 @@
+"""
+Tests for building an index with FAISSIndexBuilder and loading it with RAGRetriever
+"""
+
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+import pytest
+
+from src.config import RETRIEVAL_PARAMS_BY_BUCKET
+
+
+# PQ16x4 keeps PQ training fast on 400 vectors (PQ{m} 8-bit needs minutes)
+@pytest.mark.parametrize("index_factory", ["IVF{nlist},SQ8", "IVF{nlist},PQ16x4"])
+def test_ivf_index_builds_loads_and_searches(build_retriever, index_factory):
+    retriever = build_retriever(index_factory=index_factory)
+    
+    assert isinstance(retriever.index, faiss.IndexIVF)
+    assert retriever.index.ntotal == 400
+    assert len(retriever.metadata) == 400
+    
+    # A document's own text embeds to its stored vector, so it ranks first
+    text = retriever._doc_texts[7]
+    documents = retriever.retrieve(text, top_k=3)
+    
+    assert documents['ids'][0] == 'doc_7'
+    assert documents['texts'][0] == text
+    assert len(documents['scores']) == 3
+
+
+def test_small_index_factory_roundtrip(build_retriever):
+    retriever = build_retriever(index_factory="SQfp16", n_rows=50)
+    
+    documents, context = retriever.retrieve_and_format(retriever._doc_texts[4])
+    
+    assert documents['ids'][0] == 'doc_4'
+    assert context.startswith("[Context 1]\n" + retriever._doc_texts[4])
+
+
+def _lists_scanned(retriever, query, nprobe=None):
+    """Number of IVF lists visited by one (uncached) retrieval"""
+    stats = faiss.cvar.indexIVF_stats
+    stats.reset()
+    retriever.retrieve(query, nprobe=nprobe)
+    return stats.nlist
+
+
+def test_per_call_nprobe_is_applied(build_retriever):
+    retriever = build_retriever()
+    ivf_index = faiss.extract_index_ivf(retriever.index)
+    
+    assert retriever._per_call_nprobe
+    assert _lists_scanned(retriever, "where is my parcel") == ivf_index.nprobe
+    assert _lists_scanned(retriever, "where is my parcel now", nprobe=ivf_index.nlist) == ivf_index.nlist
+    
+    # The index default is left untouched by per-call overrides
+    assert _lists_scanned(retriever, "where is my parcel today") == ivf_index.nprobe
+
+
+def test_per_call_nprobe_is_ignored_for_flat_indexes(build_retriever):
+    retriever = build_retriever(index_factory="SQfp16", n_rows=50)
+    
+    assert not retriever._per_call_nprobe
+    assert retriever._effective_nprobe(8) is None
+    assert len(retriever.retrieve("where is my parcel", nprobe=8)['ids']) == retriever.top_k
+
+
+def test_bucket_b_scans_fewer_lists_than_the_index_default(build_retriever):
+    # 5000 vectors -> nlist 128, default nprobe 4
+    retriever = build_retriever(n_rows=5000)
+    _, nprobe_scale = RETRIEVAL_PARAMS_BY_BUCKET['BUCKET_B']
+    nprobe = retriever.scaled_nprobe(nprobe_scale)
+    
+    default_scanned = _lists_scanned(retriever, "where is my parcel")
+    bucket_b_scanned = _lists_scanned(retriever, "where is my parcel now", nprobe=nprobe)
+    
+    assert default_scanned == retriever.default_nprobe > 1
+    assert 1 <= bucket_b_scanned < default_scanned
+
+
+def test_explicit_faiss_nprobe_applies_to_every_bucket(build_retriever, monkeypatch):
+    import src.retriever as retriever_module
+    monkeypatch.setattr(retriever_module, 'FAISS_NPROBE', 3)
+    retriever = build_retriever()
+    
+    assert retriever.default_nprobe == 3
+    assert retriever.scaled_nprobe(0.5) is None
+    assert _lists_scanned(retriever, "where is my parcel", nprobe=retriever.scaled_nprobe(0.5)) == 3
+
+
+class _RecordingInvlists:
+    """Records the list ids passed to prefetch_lists"""
+    
+    def __init__(self):
+        self.prefetched = []
+    
+    def prefetch_lists(self, list_ids, n):
+        self.prefetched.append(np.array(list_ids[:n]))
+
+
+def test_prefetch_hot_lists_keeps_the_most_probed_lists(build_retriever, monkeypatch):
+    import src.retriever as retriever_module
+    retriever = build_retriever()
+    ivf_index = faiss.extract_index_ivf(retriever.index)
+    
+    # Read the ids back instead of passing a raw pointer
+    monkeypatch.setattr(faiss, 'swig_ptr', lambda array: array)
+    monkeypatch.setattr(retriever_module, 'FAISS_PREFETCH_HOT_LISTS_K', 3)
+    invlists = _RecordingInvlists()
+    retriever._prefetch_hot_lists(SimpleNamespace(
+        quantizer=ivf_index.quantizer, nprobe=ivf_index.nprobe,
+        nlist=ivf_index.nlist, invlists=invlists
+    ))
+    
+    # All 400 instructions are sampled (fewer than FAISS_PREFETCH_SAMPLE_SIZE)
+    instructions = [entry['metadata']['instruction'] for entry in retriever.metadata]
+    vectors = retriever.embedding_model.encode(instructions, normalize_embeddings=True)
+    _, list_ids = ivf_index.quantizer.search(vectors, ivf_index.nprobe)
+    counts = np.bincount(list_ids.ravel(), minlength=ivf_index.nlist)
+    
+    assert len(invlists.prefetched) == 1
+    hot_lists = invlists.prefetched[0]
+    assert len(hot_lists) == 3 < ivf_index.nlist
+    assert list(hot_lists) == sorted(hot_lists)
+    cold_lists = np.setdiff1d(np.arange(ivf_index.nlist), hot_lists)
+    assert counts[hot_lists].min() >= counts[cold_lists].max()
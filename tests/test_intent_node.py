@@ -0,0 +1,59 @@
+"""
+Tests for IntentNode routing adjustments (sentiment escalation, template fallback)
+"""
+
+import pytest
+
+import src.nodes.intent_node as intent_node_module
+from src.nodes import IntentNode
+from src.state import ChatbotState
+
+NEUTRAL = {'label': 'NEUTRAL', 'raw_label': 'POSITIVE', 'score': 0.9, 'has_anger': False}
+
+
+@pytest.fixture(scope="module")
+def node():
+    return IntentNode()
+
+
+def _routing_result(bucket, intent):
+    return {
+        'predicted_intent': intent,
+        'confidence': 0.95,
+        'bucket': bucket,
+        'action': bucket,
+        'reason': '',
+        'cost_tier': 'Zero',
+        'top_3_predictions': [(intent, 0.95)]
+    }
+
+
+def _run(node, query, routing_result, sentiment=NEUTRAL):
+    """Run the node on a query with a precomputed routing and sentiment result"""
+    node._prefetched[query] = (routing_result, sentiment)
+    return node(ChatbotState(user_query=query))
+
+
+def test_bucket_a_without_template_is_relabeled_bucket_b(node, monkeypatch):
+    monkeypatch.setattr(intent_node_module, 'has_direct_response', lambda intent: False)
+    
+    state = _run(node, "where is my order", _routing_result('BUCKET_A', 'track_order'))
+    
+    assert state.bucket == 'BUCKET_B'
+    assert state.cost_tier == 'low'
+    assert state.predicted_intent == 'track_order'
+
+
+def test_bucket_a_with_template_is_kept(node):
+    state = _run(node, "where is my order", _routing_result('BUCKET_A', 'track_order'))
+    
+    assert state.bucket == 'BUCKET_A'
+
+
+def test_angry_query_is_escalated(node):
+    angry = {'label': 'NEGATIVE', 'raw_label': 'NEGATIVE', 'score': 0.99, 'has_anger': True}
+    
+    state = _run(node, "this is unacceptable", _routing_result('BUCKET_A', 'track_order'), angry)
+    
+    assert state.bucket == 'BUCKET_C'
+    assert state.action == 'escalate_sentiment'
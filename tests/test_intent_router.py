@@ -0,0 +1,64 @@
+"""
+Tests for IntentRouter.embed_batch / route_from_embedding
+"""
+
+from pathlib import Path
+
+import pytest
+
+from intent_router import IntentRouter
+
+MODELS_DIR = Path(__file__).parent.parent / "models"
+
+MESSAGES = [
+    "I want to cancel my order",
+    "How do I track my order?",
+    "I'm very unhappy with your service!",
+    "can you help me reset my password",
+    "I need a refund for a damaged item",
+]
+
+ROUTING_FIELDS = [
+    'predicted_intent', 'confidence', 'bucket', 'action',
+    'reason', 'cost_tier', 'top_3_predictions'
+]
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter(models_dir=str(MODELS_DIR))
+
+
+@pytest.mark.parametrize("i", range(len(MESSAGES)))
+def test_route_from_embedding_matches_route_message(router, i):
+    message = MESSAGES[i]
+    # Keyword overrides are only applied by route_message
+    assert router._keyword_intent_override(router.clean_text(message)) is None
+    
+    expected = router.route_message(message)
+    single = router.route_from_embedding(router.embed_batch([message])[0])
+    batched = router.route_from_embedding(router.embed_batch(MESSAGES)[i])
+    
+    for result in (single, batched):
+        assert {field: result[field] for field in ROUTING_FIELDS} == \
+            {field: expected[field] for field in ROUTING_FIELDS}
+
+
+def test_confidence_threshold_override(router):
+    embedding = router.embed_batch([MESSAGES[0]])[0]
+    expected = router.route_message(MESSAGES[0])
+    
+    # No prediction reaches a threshold above 1: always the low-confidence RAG fallback
+    result = router.route_from_embedding(embedding, confidence_threshold=1.01)
+    assert result['bucket'] == 'BUCKET_B'
+    assert result['action'] == 'LOW_CONFIDENCE_RAG'
+    assert result['predicted_intent'] == expected['predicted_intent']
+    
+    # Every prediction passes a zero threshold: routed by intent alone
+    result = router.route_from_embedding(embedding, confidence_threshold=0.0)
+    routing = router.get_routing_decision(expected['predicted_intent'], 1.0)
+    assert result['bucket'] == routing['bucket']
+    assert result['action'] == routing['action']
+    
+    # The override does not change the router's own threshold
+    assert router.route_from_embedding(embedding)['bucket'] == expected['bucket']